@@ -0,0 +1,48 @@
+"""SQL-запросы на просмотр страницы аутентифицированным пользователем
+с обычным и кэширующим бэкендом аутентификации."""
+from common import PASSWORD, QueryCounter, setup_django
+
+PAGES = (
+    '/',
+    '/pages/about/',
+    '/profile/edit/',
+    '/profile/{username}/',
+)
+VIEWS_PER_PAGE = 10
+BACKENDS = {
+    'ModelBackend': 'django.contrib.auth.backends.ModelBackend',
+    'CachedModelBackend': 'blog.backends.CachedModelBackend',
+}
+
+
+def main():
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client, override_settings
+
+    user = get_user_model().objects.create_user(
+        'bench-user', password=PASSWORD)
+
+    print(f'{"страница":<24}'
+          + ''.join(f'{name:>20}' for name in BACKENDS))
+    for page in PAGES:
+        url = page.format(username=user.username)
+        row = f'{url:<24}'
+        for backend in BACKENDS.values():
+            cache.clear()
+            with override_settings(AUTHENTICATION_BACKENDS=[backend]):
+                client = Client()
+                client.login(username=user.username, password=PASSWORD)
+                client.get(url)
+                counter = QueryCounter()
+                with connection.execute_wrapper(counter):
+                    for _ in range(VIEWS_PER_PAGE):
+                        client.get(url)
+            row += f'{counter.count / VIEWS_PER_PAGE:>20.1f}'
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
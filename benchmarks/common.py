@@ -0,0 +1,78 @@
+"""Общая подготовка окружения для бенчмарков.
+
+Бенчмарки работают на временной базе SQLite и не трогают db.sqlite3.
+Запуск из корня репозитория: python benchmarks/<имя>.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+PASSWORD = 'benchmark-password'
+
+
+def setup_django(extra_databases=()):
+    """Настройка Django на временных базах и применение миграций"""
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    tmp_dir = tempfile.mkdtemp(prefix='blogicum-bench-')
+    for alias in ('default', *extra_databases):
+        settings.DATABASES[alias] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(tmp_dir, f'{alias}.sqlite3'),
+            'OPTIONS': {'timeout': 30},
+        }
+    settings.PASSWORD_HASHERS = [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ]
+    settings.ALLOWED_HOSTS = ['*']
+    settings.DEBUG = False
+    warnings.filterwarnings('ignore', 'DateTimeField .* naive datetime')
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return tmp_dir
+
+
+class QueryCounter:
+    """Обёртка execute_wrapper, считающая SQL-запросы всех потоков"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_concurrently(worker, arguments):
+    """Запуск worker в отдельном потоке на каждый аргумент;
+       возвращает время работы в секундах"""
+    from django.db import connections
+
+    def target(argument):
+        try:
+            worker(argument)
+        finally:
+            connections.close_all()
+
+    threads = [
+        threading.Thread(target=target, args=(argument,))
+        for argument in arguments
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started
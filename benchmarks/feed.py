@@ -0,0 +1,116 @@
+"""Время построения страницы ленты подписок: слияние по авторам
+(blog.timeline.get_feed_page) и материализованная лента
+(get_timeline_page) против одного запроса с author IN (...) и сортировкой
+по дате, при разном числе подписок."""
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from common import setup_django
+
+AUTHORS = 5000
+POSTS_PER_AUTHOR = 20
+FOLLOWS = (10, 100, 1000, 5000)
+PAGE_SIZE = 10
+PAGES = 5
+REPEATS = 5
+
+
+def measure(function):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.db.models import Count
+    from django.utils import timezone
+
+    from blog.models import Category, Follow, Post, TimelineEntry
+    from blog.timeline import (
+        before_cursor, get_feed_page, get_published_posts,
+        get_timeline_page, parse_cursor
+    )
+
+    User = get_user_model()
+    random.seed(1)
+    now = timezone.now()
+    category = Category.objects.create(
+        title='Бенчмарк', description='-', slug='bench')
+    User.objects.bulk_create(
+        User(username=f'author-{number}') for number in range(AUTHORS))
+    authors = list(User.objects.values_list('pk', flat=True))
+    Post.objects.bulk_create(
+        (
+            Post(title='Публикация', text='-', author_id=author,
+                 category=category,
+                 pub_date=now - timedelta(minutes=random.randrange(10 ** 6)))
+            for author in authors
+            for _ in range(POSTS_PER_AUTHOR)
+        ),
+        batch_size=5000)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    def naive_page(reader, cursor):
+        return list(
+            get_published_posts().filter(
+                before_cursor(cursor), author__followers__user=reader
+            ).select_related('category', 'location', 'author').annotate(
+                comment_count=Count('comments')
+            ).order_by('-pub_date', '-pk')[:PAGE_SIZE])
+
+    def merged_page(reader, cursor):
+        return get_feed_page(reader, cursor, PAGE_SIZE)[0]
+
+    def timeline_page(reader, cursor):
+        return get_timeline_page(reader, cursor, PAGE_SIZE)[0]
+
+    def read_pages(page, reader):
+        cursor = None
+        for _ in range(PAGES):
+            posts = page(reader, cursor)
+            cursor = posts[-1].pub_date, posts[-1].pk
+
+    print(f'{AUTHORS * POSTS_PER_AUTHOR} публикаций, {PAGES} страниц '
+          f'по {PAGE_SIZE}, медиана из {REPEATS}, мс')
+    print(f'{"подписок":>10}{"author IN":>14}{"слияние":>14}'
+          f'{"лента":>14}')
+    for follows in FOLLOWS:
+        reader = User.objects.create(username=f'reader-{follows}')
+        Follow.objects.bulk_create(
+            Follow(user=reader, author_id=author)
+            for author in random.sample(authors, follows))
+        assert (
+            [post.pk for post in naive_page(reader, None)]
+            == [post.pk for post in merged_page(reader, None)]
+        )
+        assert parse_cursor(get_feed_page(reader, None, PAGE_SIZE)[1])
+        # Лента в состоянии после рассылок: последние публикации авторов.
+        TimelineEntry.objects.bulk_create(
+            TimelineEntry(user=reader, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in get_published_posts().filter(
+                author__followers__user=reader
+            ).order_by('-pub_date').values_list('pk', 'pub_date')[
+                :settings.TIMELINE_MAX_ENTRIES])
+        assert (
+            [post.pk for post in naive_page(reader, None)]
+            == [post.pk for post in timeline_page(reader, None)]
+        )
+        naive = measure(lambda: read_pages(naive_page, reader))
+        merged = measure(lambda: read_pages(merged_page, reader))
+        timeline = measure(lambda: read_pages(timeline_page, reader))
+        print(f'{follows:>10}{naive:>14.1f}{merged:>14.1f}'
+              f'{timeline:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Сравнение бэкендов сессий при одновременных входах пользователей."""
+from contextlib import ExitStack
+
+from common import (
+    PASSWORD, QueryCounter, run_concurrently, setup_django
+)
+
+USERS = 20
+REQUESTS_PER_USER = 20
+BACKENDS = {
+    'database': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'separate_db': 'django.contrib.sessions.backends.db',
+}
+
+
+def main():
+    setup_django(extra_databases=('sessions',))
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connections
+    from django.test import Client, override_settings
+
+    with override_settings(DATABASE_ROUTERS=[
+            'blogicum.routers.SessionRouter']):
+        call_command('migrate', database='sessions', verbosity=0)
+
+    User = get_user_model()
+    usernames = [f'bench-user-{number}' for number in range(USERS)]
+    for username in usernames:
+        User.objects.create_user(username, password=PASSWORD)
+
+    print(f'{"бэкенд":<16}{"время, с":>10}{"запр./с":>10}'
+          f'{"SQL на запрос":>16}')
+    for name, engine in BACKENDS.items():
+        routers = (['blogicum.routers.SessionRouter']
+                   if name == 'separate_db' else [])
+        counter = QueryCounter()
+
+        def login_and_browse(username):
+            client = Client()
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(counter))
+                client.post('/auth/login/',
+                            {'username': username, 'password': PASSWORD})
+                for _ in range(REQUESTS_PER_USER):
+                    client.get('/pages/about/')
+
+        with override_settings(SESSION_ENGINE=engine,
+                               DATABASE_ROUTERS=routers):
+            elapsed = run_concurrently(login_and_browse, usernames)
+        requests = USERS * (REQUESTS_PER_USER + 1)
+        print(f'{name:<16}{elapsed:>10.2f}{requests / elapsed:>10.0f}'
+              f'{counter.count / requests:>16.2f}')
+
+
+if __name__ == '__main__':
+    main()
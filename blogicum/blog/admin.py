@@ -1,8 +1,121 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
 
-from .models import Category, Location, Post, Comment
+from .models import (
+    Category, Comment, DeletionJob, Location, Post, Tag, User
+)
+from .paginators import EstimatedCountPaginator
+from .services import schedule_deletion, set_published
 
-admin.site.register(Category)
-admin.site.register(Location)
-admin.site.register(Post)
-admin.site.register(Comment)
+DELETE_PREVIEW_SIZE = 100
+
+
+class ChunkedDeletionMixin:
+    """Удаление через фоновую задачу вместо каскада в одной транзакции.
+
+    Страница подтверждения не собирает все связанные объекты.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        opts = self.model._meta
+        objs = list(objs[:DELETE_PREVIEW_SIZE])
+        deleted_objects = [
+            f'{opts.verbose_name.capitalize()}: {obj}' for obj in objs
+        ]
+        perms_needed = set()
+        if not self.has_delete_permission(request):
+            perms_needed.add(opts.verbose_name)
+        return deleted_objects, {opts.verbose_name_plural: len(objs)}, \
+            perms_needed, []
+
+    def delete_model(self, request, obj):
+        schedule_deletion(obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset.iterator():
+            schedule_deletion(obj)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class PublishableAdmin(ChunkedDeletionMixin, LargeTableAdmin):
+    actions = ('publish', 'unpublish')
+
+    @admin.action(description='Опубликовать выбранные')
+    def publish(self, request, queryset):
+        updated = set_published(queryset, True)
+        self.message_user(request, f'Опубликовано: {updated}')
+
+    @admin.action(description='Снять с публикации выбранные')
+    def unpublish(self, request, queryset):
+        updated = set_published(queryset, False)
+        self.message_user(request, f'Снято с публикации: {updated}')
+
+
+@admin.register(Category)
+class CategoryAdmin(PublishableAdmin):
+    list_display = ('title', 'slug', 'is_published', 'created_at')
+    list_editable = ('is_published',)
+    list_filter = ('is_published',)
+    search_fields = ('^title',)
+    prepopulated_fields = {'slug': ('title',)}
+
+
+@admin.register(Location)
+class LocationAdmin(PublishableAdmin):
+    list_display = ('name', 'latitude', 'longitude', 'is_published',
+                    'created_at')
+    list_editable = ('is_published',)
+    list_filter = ('is_published',)
+    search_fields = ('^name',)
+
+
+@admin.register(Post)
+class PostAdmin(PublishableAdmin):
+    list_display = (
+        'title', 'author', 'category', 'location', 'pub_date',
+        'is_published',
+    )
+    list_editable = ('is_published',)
+    # Фильтр по категории вывел бы на каждой странице список всех категорий.
+    list_filter = ('is_published',)
+    list_select_related = ('author', 'category', 'location')
+    search_fields = ('^title',)
+    autocomplete_fields = ('author', 'category', 'location')
+
+
+@admin.register(Tag)
+class TagAdmin(LargeTableAdmin):
+    list_display = ('name', 'slug', 'post_count')
+    search_fields = ('^name',)
+    prepopulated_fields = {'slug': ('name',)}
+
+
+@admin.register(Comment)
+class CommentAdmin(LargeTableAdmin):
+    list_display = ('text', 'post', 'author', 'created_at')
+    list_select_related = ('post', 'author')
+    raw_id_fields = ('post',)
+    # Путь в ветке задаётся при создании и не пересчитывается.
+    readonly_fields = ('parent',)
+    autocomplete_fields = ('author',)
+
+
+@admin.register(DeletionJob)
+class DeletionJobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'processed', 'total', 'created_at',
+                    'finished_at')
+    list_filter = ('model',)
+    readonly_fields = ('model', 'object_id', 'total', 'processed',
+                       'created_at', 'finished_at')
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class BlogUserAdmin(ChunkedDeletionMixin, UserAdmin):
+    pass
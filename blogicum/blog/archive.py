@@ -0,0 +1,101 @@
+from collections import Counter
+from datetime import date, datetime
+
+from django.db import transaction
+from django.db.models import Count, DateField, F, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import MonthlyPostCount
+from .tags import get_visible_posts
+
+
+def get_month(value):
+    """Первый день месяца даты публикации в текущем часовом поясе"""
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return timezone.localtime(value).date().replace(day=1)
+
+
+def month_range(month):
+    """Начало месяца и начало следующего как aware datetime"""
+    following = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return tuple(
+        timezone.make_aware(datetime(day.year, day.month, 1))
+        for day in (month, following)
+    )
+
+
+def truncate_month(posts):
+    return posts.annotate(
+        month=TruncMonth('pub_date', output_field=DateField()))
+
+
+def recount_months(months):
+    """Пересчёт счётчиков перечисленных месяцев по диапазонам индекса
+       pub_date; месяцы без публикаций удаляются"""
+    months = set(months)
+    if not months:
+        return
+    ranges = Q()
+    for month in months:
+        start, end = month_range(month)
+        ranges |= Q(pub_date__gte=start, pub_date__lt=end)
+    counts = dict(truncate_month(
+        get_visible_posts().filter(ranges)
+    ).order_by().values('month').annotate(
+        total=Count('pk')
+    ).values_list('month', 'total'))
+    MonthlyPostCount.objects.filter(month__in=months - set(counts)).delete()
+    for month, total in counts.items():
+        MonthlyPostCount.objects.update_or_create(
+            month=month, defaults={'post_count': total})
+
+
+def get_month_counts():
+    """Счётчики месяцев для вывода, без отложенных публикаций.
+
+    Отложенные публикации входят в счётчики, чтобы не пересчитывать
+    месяц при наступлении даты публикации; здесь они вычитаются по
+    диапазону индекса pub_date после текущего момента.
+    """
+    scheduled = Counter(
+        get_month(pub_date)
+        for pub_date in get_visible_posts().filter(
+            pub_date__gt=timezone.now()).values_list('pub_date', flat=True)
+    )
+    months = []
+    for counter in MonthlyPostCount.objects.all():
+        counter.post_count -= scheduled[counter.month]
+        if counter.post_count > 0:
+            months.append(counter)
+    return months
+
+
+def change_month_count(month, delta):
+    """Изменение счётчика месяца на delta; обнулившийся месяц удаляется"""
+    counters = MonthlyPostCount.objects.filter(month=month)
+    if delta > 0:
+        MonthlyPostCount.objects.bulk_create(
+            [MonthlyPostCount(month=month, post_count=0)],
+            ignore_conflicts=True)
+    else:
+        counters.filter(post_count__lte=-delta).delete()
+    counters.update(post_count=F('post_count') + delta)
+
+
+def refresh_archive(posts):
+    """Пересчёт месяцев, в которые попадают публикации выборки"""
+    recount_months(truncate_month(posts).order_by().values_list(
+        'month', flat=True).distinct())
+
+
+def rebuild_archive():
+    """Полный пересчёт архива, например после bulk_create"""
+    counts = truncate_month(get_visible_posts()).order_by().values(
+        'month').annotate(total=Count('pk')).values_list('month', 'total')
+    with transaction.atomic():
+        MonthlyPostCount.objects.all().delete()
+        MonthlyPostCount.objects.bulk_create(
+            MonthlyPostCount(month=month, post_count=total)
+            for month, total in counts)
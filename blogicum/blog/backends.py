@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_KEY = 'auth-user:{}'
+
+
+def get_user_cache_key(user_id):
+    return USER_CACHE_KEY.format(user_id)
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который кэширует пользователя сессии на короткое время.
+
+    Кэш сбрасывается сигналами при сохранении и удалении пользователя.
+    """
+
+    def get_user(self, user_id):
+        key = get_user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,203 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+
+from . import hll
+from .models import Post, ReaderSketch
+from .trending import record_activity
+
+logger = logging.getLogger(__name__)
+# Как часто фоновый поток проверяет, не пора ли сбросить буфер, в секундах.
+FLUSH_CHECK_DELAY = 1
+
+
+class WriteBuffer(ABC):
+    """Изменения в памяти процесса, сбрасываемые в БД пачками.
+
+    Изменения копятся по ключам и раз в POST_VIEWS_FLUSH_INTERVAL секунд
+    (или при накоплении POST_VIEWS_MAX_PENDING ключей) записываются одной
+    транзакцией. Сброс по интервалу выполняет фоновый поток, поэтому
+    значения в БД отстают не больше чем на интервал, даже если новых
+    изменений нет. Ошибка записи не доходит до запроса: изменения
+    остаются в памяти до следующего сброса.
+    """
+
+    def __init__(self):
+        self.pending = self.new_pending()
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+        # Поток запускается при первом изменении в каждом процессе.
+        self.flusher_pid = None
+        atexit.register(self.flush_on_exit)
+
+    @abstractmethod
+    def new_pending(self):
+        pass
+
+    @abstractmethod
+    def update(self, pending, key, value):
+        pass
+
+    @abstractmethod
+    def write(self, pending):
+        pass
+
+    def add(self, key, value):
+        with self.lock:
+            if self.flusher_pid != os.getpid():
+                self.flusher_pid = os.getpid()
+                threading.Thread(
+                    target=self.flush_periodically, daemon=True).start()
+            self.update(self.pending, key, value)
+            due = (
+                len(self.pending) >= settings.POST_VIEWS_MAX_PENDING
+                or time.monotonic() - self.last_flush
+                >= settings.POST_VIEWS_FLUSH_INTERVAL
+            )
+        if due:
+            try:
+                self.flush()
+            except DatabaseError:
+                logger.exception(
+                    'Не удалось записать буфер %s', type(self).__name__)
+
+    def flush(self):
+        """Запись накопленных изменений; возвращает число ключей"""
+        with self.lock:
+            pending, self.pending = self.pending, self.new_pending()
+            self.last_flush = time.monotonic()
+        if not pending:
+            return 0
+        try:
+            with transaction.atomic():
+                self.write(pending)
+        except Exception:
+            with self.lock:
+                for key, value in pending.items():
+                    self.update(self.pending, key, value)
+            raise
+        return len(pending)
+
+    def flush_periodically(self):
+        """Сброс раз в POST_VIEWS_FLUSH_INTERVAL секунд после прошлого"""
+        while True:
+            time.sleep(FLUSH_CHECK_DELAY)
+            if (time.monotonic() - self.last_flush
+                    < settings.POST_VIEWS_FLUSH_INTERVAL):
+                continue
+            try:
+                self.flush()
+            except Exception:
+                logger.exception(
+                    'Не удалось записать буфер %s', type(self).__name__)
+            finally:
+                # Соединения этого потока не нужны до следующего сброса.
+                connections.close_all()
+
+    def flush_on_exit(self):
+        try:
+            self.flush()
+        except Exception:
+            # При остановке процесса потеря нескольких секунд просмотров
+            # допустима, а повторить запись уже негде.
+            pass
+
+
+class BufferedCounter(WriteBuffer):
+    """Счётчик: приращения по id объектов"""
+
+    def __init__(self, manager, field):
+        self.manager = manager
+        self.field = field
+        super().__init__()
+
+    def new_pending(self):
+        return Counter()
+
+    def update(self, pending, pk, amount):
+        pending[pk] += amount
+
+    def incr(self, pk, amount=1):
+        self.add(pk, amount)
+
+    def write(self, pending):
+        by_amount = defaultdict(list)
+        for pk, amount in pending.items():
+            by_amount[amount].append(pk)
+        # Один UPDATE на каждое различное приращение.
+        for amount, pks in by_amount.items():
+            self.manager.filter(pk__in=pks).update(
+                **{self.field: F(self.field) + amount})
+
+
+class PostViewCounter(BufferedCounter):
+    """Просмотры публикаций: общий счётчик и окна рейтинга популярного"""
+
+    def write(self, pending):
+        super().write(pending)
+        record_activity(pending, 'views')
+
+
+class BufferedSketches(WriteBuffer):
+    """HyperLogLog-регистры по ключам (область, id объекта).
+
+    Значение — строка-идентификатор читателя или уже накопленные регистры.
+    """
+
+    def new_pending(self):
+        return {}
+
+    def update(self, pending, key, value):
+        registers = pending.setdefault(key, bytearray(hll.REGISTERS))
+        if isinstance(value, str):
+            hll.add(registers, value)
+        else:
+            pending[key] = bytearray(hll.merge(registers, value))
+
+    def write(self, pending):
+        ReaderSketch.objects.bulk_create(
+            [
+                ReaderSketch(scope=scope, object_id=object_id,
+                             registers=hll.EMPTY)
+                for scope, object_id in pending
+            ],
+            ignore_conflicts=True)
+        by_scope = defaultdict(list)
+        for scope, object_id in pending:
+            by_scope[scope].append(object_id)
+        sketches = []
+        for scope, object_ids in by_scope.items():
+            for sketch in ReaderSketch.objects.select_for_update().filter(
+                    scope=scope, object_id__in=object_ids):
+                sketch.registers = hll.merge(
+                    bytes(sketch.registers),
+                    pending[sketch.scope, sketch.object_id])
+                sketches.append(sketch)
+        ReaderSketch.objects.bulk_update(sketches, ('registers',))
+
+    def add_reader(self, post, reader):
+        """Учёт читателя публикации, её автора и категории"""
+        self.add((ReaderSketch.POST, post.id), reader)
+        self.add((ReaderSketch.AUTHOR, post.author_id), reader)
+        if post.category_id:
+            self.add((ReaderSketch.CATEGORY, post.category_id), reader)
+
+
+def unique_readers(scope, object_ids):
+    """Оценка числа уникальных читателей объединения объектов"""
+    sketches = ReaderSketch.objects.filter(
+        scope=scope, object_id__in=object_ids
+    ).values_list('registers', flat=True)
+    return hll.estimate(hll.merge(*map(bytes, sketches)))
+
+
+post_views = PostViewCounter(Post.all_objects, 'views')
+post_readers = BufferedSketches()
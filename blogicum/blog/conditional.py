@@ -0,0 +1,36 @@
+"""Валидаторы условных запросов (ETag и Last-Modified) для страниц.
+
+Значения считаются по времени изменения (updated_at) и числу объектов,
+которые выводит страница, до основных запросов и отрисовки шаблона.
+Счётчики просмотров и читателей в валидаторы не входят: они и так
+обновляются с задержкой.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def latest_timestamp(*values):
+    """Наибольшее из времён изменения для Last-Modified"""
+    values = [value for value in values if value is not None]
+    return int(max(values).timestamp()) if values else None
+
+
+def get_not_modified(request, etag, last_modified):
+    """Ответ 304 (или 412) на условный GET, иначе None"""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,182 @@
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+
+from .conditional import (
+    get_not_modified, latest_timestamp, make_etag, set_validators
+)
+from .models import Category, User
+from .signals import get_content_version
+from .tags import get_visible_posts
+
+FEED_CACHE_PREFIX = 'blog-feed'
+
+
+class CachedFeed(Feed):
+    """Лента с условными запросами и кэшем ответа.
+
+    ETag и Last-Modified считаются по id и времени изменения
+    публикаций ленты (FEED_SIZE строк по индексу pub_date) и хранятся
+    в кэше по версии контента (get_content_version). Поэтому повторный
+    запрос и 304 не обращаются к таблице публикаций, а после изменений
+    ответ 304 возможен без отрисовки ленты. Валидаторы истекают к дате
+    ближайшей отложенной публикации ленты.
+    """
+
+    def get_posts(self, obj):
+        return get_visible_posts()
+
+    def get_cache_key(self, obj):
+        return type(self).__name__
+
+    def get_items(self, obj):
+        return self.get_posts(obj).filter(
+            pub_date__lte=timezone.now()
+        ).order_by('-pub_date', '-pk')[:settings.FEED_SIZE]
+
+    def items(self, obj):
+        return self.get_items(obj).select_related(
+            'author', 'category').prefetch_related('tags')
+
+    def get_validators(self, obj):
+        rows = list(self.get_items(obj).values_list(
+            'pk', 'updated_at', 'category__updated_at'))
+        changes = [
+            changed for _, *row_changes in rows for changed in row_changes
+        ]
+        obj_changed = getattr(obj, 'updated_at', None)
+        return (make_etag(str(obj), obj_changed, rows),
+                latest_timestamp(obj_changed, *changes))
+
+    def get_timeout(self, obj):
+        scheduled = self.get_posts(obj).filter(
+            pub_date__gt=timezone.now()
+        ).order_by('pub_date').values_list('pub_date', flat=True).first()
+        if scheduled is None:
+            return settings.FEED_CACHE_TIMEOUT
+        return max(1, min(
+            settings.FEED_CACHE_TIMEOUT,
+            int((scheduled - timezone.now()).total_seconds()) + 1))
+
+    def __call__(self, request, *args, **kwargs):
+        obj = self.get_object(request, *args, **kwargs)
+        # Ссылки в ленте абсолютные, поэтому в ключе есть домен запроса.
+        cache_key = '{}:{}:{}'.format(
+            FEED_CACHE_PREFIX, request.get_host(), self.get_cache_key(obj))
+        validators_key = f'{cache_key}:{get_content_version()}'
+        validators = cache.get(validators_key)
+        if validators is None:
+            validators = self.get_validators(obj)
+            cache.set(validators_key, validators, self.get_timeout(obj))
+        etag, last_modified = validators
+        response = get_not_modified(request, etag, last_modified)
+        if response is None:
+            content_key = f'{cache_key}:{etag}'
+            cached = cache.get(content_key)
+            if cached is None:
+                feed = super().__call__(request, *args, **kwargs)
+                cached = feed.content, feed['Content-Type']
+                cache.set(content_key, cached, settings.FEED_CACHE_TIMEOUT)
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+        return set_validators(response, etag, last_modified)
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return Truncator(item.text).words(50)
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=(item.pk,))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        categories = [tag.name for tag in item.tags.all()]
+        if item.category:
+            categories.insert(0, item.category.title)
+        return categories
+
+
+class LatestPostsFeed(CachedFeed):
+    title = 'Блогикум'
+    description = 'Новые публикации'
+
+    def link(self):
+        return reverse('blog:index')
+
+
+class CategoryPostsFeed(CachedFeed):
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True)
+
+    def get_posts(self, category):
+        return super().get_posts(category).filter(category=category)
+
+    def get_cache_key(self, category):
+        return f'{super().get_cache_key(category)}:{category.pk}'
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse('blog:category_posts', args=(category.slug,))
+
+
+class AuthorPostsFeed(CachedFeed):
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def get_posts(self, author):
+        return super().get_posts(author).filter(author=author)
+
+    def get_cache_key(self, author):
+        return f'{super().get_cache_key(author)}:{author.pk}'
+
+    def title(self, author):
+        return f'Блогикум: @{author.username}'
+
+    def description(self, author):
+        return f'Публикации пользователя {author.username}'
+
+    def link(self, author):
+        return reverse('blog:profile', args=(author.username,))
+
+
+class AtomFeedMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class LatestPostsAtomFeed(AtomFeedMixin, LatestPostsFeed):
+    pass
+
+
+class CategoryPostsAtomFeed(AtomFeedMixin, CategoryPostsFeed):
+    pass
+
+
+class AuthorPostsAtomFeed(AtomFeedMixin, AuthorPostsFeed):
+    pass
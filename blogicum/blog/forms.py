@@ -1,13 +1,49 @@
 from django import forms
+from django.conf import settings
 
-from .models import Post, Comment, User
+from .models import Post, Comment, User, TAG_LENGTH
+from .tags import MAX_POST_TAGS, get_tag_slug
+from .widgets import AutocompleteSelect
 
 
 class PostForm(forms.ModelForm):
+    tag_names = forms.CharField(
+        label='Теги',
+        required=False,
+        help_text=f'Через запятую, не больше {MAX_POST_TAGS}.',
+    )
 
     class Meta:
         model = Post
-        exclude = ('author',)
+        exclude = ('author', 'tags')
+        widgets = {
+            'category': AutocompleteSelect('blog:autocomplete_category'),
+            'location': AutocompleteSelect('blog:autocomplete_location'),
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault('tag_names', ', '.join(
+                self.instance.tags.order_by('name').values_list(
+                    'name', flat=True)))
+
+    def clean_tag_names(self):
+        names = []
+        for name in self.cleaned_data['tag_names'].split(','):
+            name = ' '.join(name.lower().split())
+            if not name or name in names:
+                continue
+            if len(name) > TAG_LENGTH:
+                raise forms.ValidationError(
+                    f'Тег длиннее {TAG_LENGTH} символов: {name}')
+            if not get_tag_slug(name):
+                raise forms.ValidationError(f'Недопустимый тег: {name}')
+            names.append(name)
+        if len(names) > MAX_POST_TAGS:
+            raise forms.ValidationError(
+                f'Не больше {MAX_POST_TAGS} тегов.')
+        return names
 
 
 class CommentForm(forms.ModelForm):
@@ -22,3 +58,18 @@ class UserForm(forms.ModelForm):
     class Meta:
         model = User
         fields = ('username', 'first_name', 'last_name', 'email')
+
+
+class NearbyForm(forms.Form):
+    latitude = forms.FloatField(label='Широта', min_value=-90, max_value=90)
+    longitude = forms.FloatField(
+        label='Долгота', min_value=-180, max_value=180)
+    radius = forms.FloatField(
+        label='Радиус, км',
+        min_value=0.1,
+        max_value=settings.NEARBY_MAX_RADIUS,
+        required=False,
+    )
+
+    def clean_radius(self):
+        return self.cleaned_data['radius'] or settings.NEARBY_DEFAULT_RADIUS
@@ -0,0 +1,99 @@
+"""Geohash: ячейки сетки широты и долготы в виде строк, у вложенных ячеек
+общий префикс. Поиск в радиусе выбирает диапазоны префиксов по индексу,
+точное расстояние считается по выбранным координатам.
+"""
+import math
+
+ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+PRECISION = 12
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Символ после последнего символа алфавита: конец диапазона префикса.
+PREFIX_END = '{'
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    """Geohash точки длиной precision символов"""
+    south, north = -90.0, 90.0
+    west, east = -180.0, 180.0
+    chars = []
+    value, bits, even = 0, 0, True
+    while len(chars) < precision:
+        if even:
+            middle = (west + east) / 2
+            value = value << 1 | (longitude >= middle)
+            if longitude >= middle:
+                west = middle
+            else:
+                east = middle
+        else:
+            middle = (south + north) / 2
+            value = value << 1 | (latitude >= middle)
+            if latitude >= middle:
+                south = middle
+            else:
+                north = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(ALPHABET[value])
+            value, bits = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Высота и ширина ячейки в градусах"""
+    bits = 5 * precision
+    return 180 / 2 ** (bits // 2), 360 / 2 ** (bits - bits // 2)
+
+
+def wrap_longitude(longitude):
+    return (longitude + 180) % 360 - 180
+
+
+def covering_prefixes(latitude, longitude, radius_km):
+    """Префиксы ячеек, покрывающих круг радиуса radius_km.
+
+    Берётся самая мелкая сетка, ячейка которой не меньше описанного
+    прямоугольника; тогда прямоугольник задевают не больше четырёх
+    ячеек — те, в которые попадают его углы. Пустой список — искать
+    по всем точкам.
+    """
+    height = radius_km / KM_PER_DEGREE
+    south = max(latitude - height, -90.0)
+    north = min(latitude + height, 90.0)
+    widest = max(abs(south), abs(north))
+    if widest >= 90:
+        return []
+    width = height / math.cos(math.radians(widest))
+    precision = PRECISION
+    while precision and any(
+            size < 2 * span
+            for size, span in zip(cell_size(precision), (height, width))):
+        precision -= 1
+    if not precision:
+        return []
+    return sorted({
+        encode(lat, wrap_longitude(lon), precision)
+        for lat in (south, north)
+        for lon in (longitude - width, longitude + width)
+    })
+
+
+def distances_km(latitude, longitude, latitudes, longitudes):
+    """Расстояния по дуге от точки до каждой точки из пар столбцов
+       latitudes и longitudes (формула гаверсинуса)"""
+    origin_lat = math.radians(latitude)
+    origin_lon = math.radians(longitude)
+    cos_origin = math.cos(origin_lat)
+    lats = [math.radians(value) for value in latitudes]
+    lons = [math.radians(value) for value in longitudes]
+    halves = [
+        math.sin((lat - origin_lat) / 2) ** 2
+        + cos_origin * math.cos(lat) * math.sin((lon - origin_lon) / 2) ** 2
+        for lat, lon in zip(lats, lons)
+    ]
+    return [
+        2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(half, 1.0)))
+        for half in halves
+    ]
@@ -0,0 +1,43 @@
+"""HyperLogLog: оценка числа уникальных значений по регистрам фиксированного
+размера. Регистры хранятся как bytes, объединение — поэлементный максимум.
+"""
+import hashlib
+import math
+
+PRECISION = 10
+REGISTERS = 1 << PRECISION
+HASH_BITS = 64
+RANK_BITS = HASH_BITS - PRECISION
+ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+INVERSE_POWERS = [2.0 ** -rank for rank in range(RANK_BITS + 2)]
+EMPTY = bytes(REGISTERS)
+
+
+def add(registers, value):
+    """Учёт значения в изменяемых регистрах (bytearray)"""
+    digest = int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+    index = digest >> RANK_BITS
+    rank = RANK_BITS - (digest & ((1 << RANK_BITS) - 1)).bit_length() + 1
+    if rank > registers[index]:
+        registers[index] = rank
+
+
+def merge(*sketches):
+    """Объединение нескольких наборов регистров"""
+    if not sketches:
+        return EMPTY
+    if len(sketches) == 1:
+        return bytes(sketches[0])
+    return bytes(map(max, *sketches))
+
+
+def estimate(registers):
+    """Оценка числа уникальных значений, погрешность около 3%"""
+    total = sum(map(INVERSE_POWERS.__getitem__, registers))
+    result = ALPHA * REGISTERS * REGISTERS / total
+    zeros = registers.count(0)
+    if result <= 2.5 * REGISTERS and zeros:
+        # Поправка для малых значений: линейный подсчёт.
+        result = REGISTERS * math.log(REGISTERS / zeros)
+    return round(result)
@@ -0,0 +1,42 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = ('Удаляет истёкшие сессии пачками, не блокируя базу данных '
+            'надолго')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Пауза между пачками, в секундах')
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            raise CommandError(
+                f'Бэкенд сессий {settings.SESSION_ENGINE} не хранит сессии '
+                'в базе данных.')
+        model = store.get_model_class()
+        database = router.db_for_write(model)
+        expired = model.objects.using(database).filter(
+            expire_date__lt=timezone.now())
+        deleted = 0
+        while True:
+            with transaction.atomic(using=database):
+                keys = list(expired.values_list(
+                    'session_key', flat=True)[:options['batch_size']])
+                if not keys:
+                    break
+                model.objects.using(database).filter(
+                    session_key__in=keys).delete()
+            deleted += len(keys)
+            time.sleep(options['pause'])
+        self.stdout.write(f'Удалено сессий: {deleted}')
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Category, Location, Post, User
+from blog.services import CHUNK_SIZE, run_deletion_jobs, schedule_deletion
+
+MODELS = {
+    'post': Post,
+    'category': Category,
+    'location': Location,
+    'user': User,
+}
+
+
+class Command(BaseCommand):
+    help = 'Ставит объекты в очередь на фоновое удаление пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=MODELS)
+        parser.add_argument('--ids', nargs='+', type=int, required=True)
+        parser.add_argument(
+            '--now', action='store_true',
+            help='Сразу выполнить задачи, не дожидаясь фонового процесса')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = MODELS[options['model']].objects.filter(
+            pk__in=options['ids'])
+        scheduled = 0
+        for obj in queryset.iterator():
+            schedule_deletion(obj)
+            scheduled += 1
+        self.stdout.write(f'Поставлено в очередь: {scheduled}')
+        if options['now']:
+            finished = run_deletion_jobs(options['chunk_size'], 0)
+            self.stdout.write(f'Завершено задач: {finished}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.archive import rebuild_archive
+from blog.models import MonthlyPostCount
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает число публикаций по месяцам, например после '
+            'массовой загрузки публикаций')
+
+    def handle(self, *args, **options):
+        rebuild_archive()
+        self.stdout.write(
+            f'Месяцев в архиве: {MonthlyPostCount.objects.count()}')
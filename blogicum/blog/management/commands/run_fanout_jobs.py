@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.services import CHUNK_SIZE
+from blog.timeline import run_fanout_jobs
+
+
+class Command(BaseCommand):
+    help = 'Рассылает новые публикации в ленты подписчиков пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Пауза между пачками, в секундах')
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, проверяя задачи каждые --interval с')
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            finished = run_fanout_jobs(
+                options['chunk_size'], options['pause'])
+            if finished:
+                self.stdout.write(f'Завершено рассылок: {finished}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
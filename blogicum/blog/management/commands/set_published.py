@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Category, Location, Post
+from blog.services import CHUNK_SIZE, set_published
+
+MODELS = {
+    'post': Post,
+    'category': Category,
+    'location': Location,
+}
+
+
+class Command(BaseCommand):
+    help = 'Публикует или снимает с публикации объекты пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=MODELS)
+        parser.add_argument('--unpublish', action='store_true')
+        parser.add_argument('--ids', nargs='+', type=int)
+        parser.add_argument(
+            '--filter', action='append', default=[], metavar='LOOKUP=VALUE',
+            help='Условие отбора, например category__slug=travel')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = MODELS[options['model']].objects.all()
+        if options['ids']:
+            queryset = queryset.filter(pk__in=options['ids'])
+        for condition in options['filter']:
+            lookup, separator, value = condition.partition('=')
+            if not separator:
+                raise CommandError(f'Неверное условие: {condition}')
+            queryset = queryset.filter(**{lookup: value})
+        updated = set_published(
+            queryset, not options['unpublish'], options['chunk_size'])
+        self.stdout.write(f'Изменено объектов: {updated}')
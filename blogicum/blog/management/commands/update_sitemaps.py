@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import update_sitemaps
+
+
+class Command(BaseCommand):
+    help = 'Формирует заново устаревшие файлы карты сайта'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, проверяя файлы каждые --interval с')
+        parser.add_argument('--interval', type=float, default=300)
+
+    def handle(self, *args, **options):
+        while True:
+            updated = update_sitemaps()
+            self.stdout.write(f'Обновлено файлов: {updated}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
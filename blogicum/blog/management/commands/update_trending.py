@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.services import CHUNK_SIZE
+from blog.trending import update_trending
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг популярных публикаций'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, пересчитывая каждые --interval с')
+        parser.add_argument('--interval', type=float, default=300)
+
+    def handle(self, *args, **options):
+        while True:
+            ranked = update_trending(options['chunk_size'])
+            self.stdout.write(f'Публикаций в рейтинге: {ranked}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,305 @@
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+import tempfile
+import threading
+import time
+import weakref
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+from PIL import Image, ImageOps
+
+from .models import Post
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+UNSATISFIABLE = object()
+
+
+class RenderLock:
+    """Блокировка отрисовки одной копии; запись в render_locks живёт,
+       пока блокировку держит или ждёт хотя бы один поток"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        self.lock.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+
+
+render_locks = weakref.WeakValueDictionary()
+render_locks_guard = threading.Lock()
+# Оценка размера кэша копий, которую ведёт процесс между обходами каталога.
+cache_usage = {'size': 0, 'checked_at': None}
+cache_usage_guard = threading.Lock()
+
+
+def get_file_path(root, path):
+    """Абсолютный путь к файлу внутри каталога root"""
+    try:
+        full_path = safe_join(root, path)
+    except SuspiciousFileOperation:
+        raise Http404('Файл не найден')
+    try:
+        file_stat = os.stat(full_path)
+    except OSError:
+        raise Http404('Файл не найден')
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404('Файл не найден')
+    return full_path, file_stat
+
+
+def get_etag(full_path, file_stat):
+    """Строгий ETag по содержимому файла, считается один раз на версию"""
+    version = f'{full_path}:{file_stat.st_size}:{file_stat.st_mtime_ns}'
+    key = 'media-etag:' + hashlib.md5(version.encode()).hexdigest()
+    etag = cache.get(key)
+    if etag is None:
+        digest = hashlib.sha256()
+        with open(full_path, 'rb') as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        etag = quote_etag(digest.hexdigest()[:32])
+        cache.set(key, etag, None)
+    return etag
+
+
+def parse_range(header, size):
+    """Разбор заголовка Range с одним диапазоном байт.
+
+    Возвращает (start, end) включительно, None если заголовок нужно
+    проигнорировать, или UNSATISFIABLE для ответа 416.
+    """
+    match = RANGE_RE.match(header or '')
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        # В пустом файле нет ни одного байта для суффиксного диапазона.
+        if not length or not size:
+            return UNSATISFIABLE
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if start >= size:
+        return UNSATISFIABLE
+    end = int(last) if last else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def if_range_matches(request, etag, last_modified):
+    """Проверка заголовка If-Range: диапазон отдаётся только для
+       неизменившегося файла"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def read_range(full_path, start, length):
+    """Потоковое чтение части файла"""
+    with open(full_path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def offload_response(path, full_path, content_type):
+    """Передача отдачи файла веб-серверу через X-Accel-Redirect/X-Sendfile"""
+    header = settings.MEDIA_SENDFILE_HEADER
+    response = HttpResponse(content_type=content_type)
+    if header == 'X-Accel-Redirect':
+        response[header] = settings.MEDIA_ACCEL_REDIRECT_URL + quote(path)
+    else:
+        response[header] = full_path
+    return response
+
+
+def file_response(request, full_path, file_stat, content_type, etag,
+                  last_modified):
+    """Отдача файла средствами Django с поддержкой Range"""
+    size = file_stat.st_size
+    byte_range = None
+    if if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range is UNSATISFIABLE:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        return FileResponse(open(full_path, 'rb'), content_type=content_type)
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        read_range(full_path, start, end - start + 1),
+        status=206,
+        content_type=content_type)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = end - start + 1
+    return response
+
+
+def serve_file(request, full_path, file_stat, path=None, content_type=None):
+    """Ответ с файлом; path задаётся для файлов, которые можно отдать
+       через веб-сервер"""
+    etag = get_etag(full_path, file_stat)
+    last_modified = int(file_stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if content_type is None:
+            content_type, _ = mimetypes.guess_type(full_path)
+            content_type = content_type or 'application/octet-stream'
+        if path is not None and settings.MEDIA_SENDFILE_HEADER:
+            response = offload_response(path, full_path, content_type)
+        else:
+            response = file_response(request, full_path, file_stat,
+                                     content_type, etag, last_modified)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve(request, path):
+    """Отдача загруженных пользователями файлов"""
+    full_path, file_stat = get_file_path(settings.MEDIA_ROOT, path)
+    return serve_file(request, full_path, file_stat, path)
+
+
+def get_rendition_path(path, file_stat, width, height):
+    """Путь к уменьшенной копии в кэше; зависит от версии оригинала"""
+    version = f'{path}:{file_stat.st_size}:{file_stat.st_mtime_ns}'
+    digest = hashlib.sha1(version.encode()).hexdigest()
+    _, ext = os.path.splitext(path)
+    return os.path.join(settings.MEDIA_RESIZE_CACHE_DIR, f'{width}x{height}',
+                        digest[:2], digest + ext.lower())
+
+
+def render_image(source_path, target_path, width, height):
+    """Уменьшение изображения с сохранением пропорций"""
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    with Image.open(source_path) as image:
+        image_format = image.format
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((width, height))
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        file = tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(target_path), delete=False)
+        try:
+            with file:
+                image.save(file, image_format)
+            os.replace(file.name, target_path)
+        except Exception:
+            os.remove(file.name)
+            raise
+
+
+def evict_renditions(keep):
+    """Удаление давно не запрошенных копий сверх лимита размера кэша;
+       возвращает размер оставшихся копий"""
+    renditions = []
+    total_size = 0
+    for root, _, files in os.walk(settings.MEDIA_RESIZE_CACHE_DIR):
+        for name in files:
+            file_path = os.path.join(root, name)
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                continue
+            renditions.append((file_stat.st_atime, file_stat.st_size,
+                               file_path))
+            total_size += file_stat.st_size
+    renditions.sort()
+    for _, size, file_path in renditions:
+        if total_size <= settings.MEDIA_RESIZE_CACHE_MAX_SIZE:
+            break
+        if file_path == keep:
+            continue
+        try:
+            os.remove(file_path)
+        except OSError:
+            continue
+        total_size -= size
+    return total_size
+
+
+def add_rendition(size, keep):
+    """Учёт новой копии; каталог кэша обходится, только когда оценка
+       размера превышает лимит или с прошлого обхода прошло
+       MEDIA_RESIZE_CACHE_CHECK_INTERVAL секунд"""
+    now = time.monotonic()
+    with cache_usage_guard:
+        cache_usage['size'] += size
+        checked_at = cache_usage['checked_at']
+        if (cache_usage['size'] <= settings.MEDIA_RESIZE_CACHE_MAX_SIZE
+                and checked_at is not None
+                and now - checked_at
+                < settings.MEDIA_RESIZE_CACHE_CHECK_INTERVAL):
+            return
+        cache_usage['checked_at'] = now
+    total_size = evict_renditions(keep)
+    with cache_usage_guard:
+        cache_usage['size'] = total_size
+
+
+def get_rendition(source_path, rendition_path, width, height):
+    """Копия из кэша или отрисовка; параллельные запросы одной копии
+       ждут единственную отрисовку"""
+    with render_locks_guard:
+        lock = render_locks.get(rendition_path)
+        if lock is None:
+            lock = render_locks[rendition_path] = RenderLock()
+    with lock:
+        try:
+            file_stat = os.stat(rendition_path)
+        except OSError:
+            render_image(source_path, rendition_path, width, height)
+            file_stat = os.stat(rendition_path)
+            add_rendition(file_stat.st_size, keep=rendition_path)
+        else:
+            os.utime(rendition_path, (time.time(), file_stat.st_mtime))
+    return file_stat
+
+
+@require_safe
+def resize(request, width, height, path):
+    """Отдача изображения публикации в одном из разрешённых размеров"""
+    if (width, height) not in settings.MEDIA_RESIZE_SIZES:
+        raise Http404('Размер не поддерживается')
+    if not path.startswith(Post.image.field.upload_to + '/'):
+        raise Http404('Файл не найден')
+    source_path, source_stat = get_file_path(settings.MEDIA_ROOT, path)
+    rendition_path = get_rendition_path(path, source_stat, width, height)
+    try:
+        file_stat = get_rendition(source_path, rendition_path, width, height)
+    except (OSError, Image.DecompressionBombError):
+        raise Http404('Файл не является изображением')
+    return serve_file(request, rendition_path, file_stat)
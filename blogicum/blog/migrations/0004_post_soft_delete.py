@@ -0,0 +1,38 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, verbose_name='Модель')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('total', models.PositiveBigIntegerField(default=0, verbose_name='Всего связанных объектов')),
+                ('processed', models.PositiveBigIntegerField(default=0, verbose_name='Удалено связанных объектов')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+            ],
+            options={
+                'verbose_name': 'задача удаления',
+                'verbose_name_plural': 'Задачи удаления',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False, help_text='Публикация скрыта и ждёт фонового удаления.', verbose_name='Удалено'),
+        ),
+        migrations.AddIndex(
+            model_name='deletionjob',
+            index=models.Index(fields=['finished_at', 'created_at'], name='deletion_job_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deletionjob',
+            name='stage',
+            field=models.CharField(blank=True, max_length=50, verbose_name='Текущий этап'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models.functions import Cast, LPad
+
+
+def fill_paths(apps, schema_editor):
+    """Существующие комментарии становятся корнями веток"""
+    Comment = apps.get_model('blog', 'Comment')
+    Comment.objects.filter(path='').update(
+        path=LPad(Cast('id', models.CharField()), 19, models.Value('0')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_deletion_job_stage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='blog.comment', verbose_name='Ответ на комментарий'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, editable=False, help_text='id предков и самого комментария по 19 цифр', max_length=255, verbose_name='Путь в ветке'),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comment_post_path_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_comment_threads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='views',
+            field=models.PositiveBigIntegerField(default=0, editable=False, help_text='Обновляется пачками, может отставать на несколько секунд.', verbose_name='Просмотры'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReaderSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('post', 'Публикация'), ('author', 'Автор'), ('category', 'Категория')], max_length=20, verbose_name='Область')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('registers', models.BinaryField(verbose_name='Регистры')),
+            ],
+            options={
+                'verbose_name': 'счётчик уникальных читателей',
+                'verbose_name_plural': 'Счётчики уникальных читателей',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='readersketch',
+            constraint=models.UniqueConstraint(fields=('scope', 'object_id'), name='reader_sketch_unique'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_reader_sketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingPost',
+            fields=[
+                ('position', models.PositiveIntegerField(primary_key=True, serialize=False, verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Рейтинг')),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='trending', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'популярная публикация',
+                'verbose_name_plural': 'Популярные публикации',
+                'ordering': ('position',),
+            },
+        ),
+        migrations.CreateModel(
+            name='PostActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.DateTimeField(verbose_name='Начало окна')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Просмотры')),
+                ('comments', models.PositiveIntegerField(default=0, verbose_name='Комментарии')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='blog.post', verbose_name='Публикация')),
+            ],
+            options={
+                'verbose_name': 'активность публикации',
+                'verbose_name_plural': 'Активность публикаций',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='postactivity',
+            constraint=models.UniqueConstraint(fields=('window', 'post'), name='post_activity_unique'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Название')),
+                ('slug', models.SlugField(allow_unicode=True, unique=True, verbose_name='Идентификатор')),
+                ('post_count', models.PositiveIntegerField(default=0, editable=False, help_text='Пересчитывается при изменении тегов и видимости публикаций.', verbose_name='Видимых публикаций')),
+            ],
+            options={
+                'verbose_name': 'тег',
+                'verbose_name_plural': 'Теги',
+            },
+        ),
+        migrations.CreateModel(
+            name='PostTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('is_visible', models.BooleanField(help_text='Публикация и её категория опубликованы, публикация не удалена.', verbose_name='Видна в ленте')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='blog.post', verbose_name='Публикация')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_tags', to='blog.tag', verbose_name='Тег')),
+            ],
+            options={
+                'verbose_name': 'тег публикации',
+                'verbose_name_plural': 'Теги публикаций',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='posts', through='blog.PostTag', to='blog.Tag', verbose_name='Теги'),
+        ),
+        migrations.AddIndex(
+            model_name='posttag',
+            index=models.Index(fields=['tag', 'is_visible', 'pub_date'], name='post_tag_feed_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='posttag',
+            constraint=models.UniqueConstraint(fields=('post', 'tag'), name='post_tag_unique'),
+        ),
+    ]
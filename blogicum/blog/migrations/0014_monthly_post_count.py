@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:23
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def fill_counts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    MonthlyPostCount = apps.get_model('blog', 'MonthlyPostCount')
+    MonthlyPostCount.objects.bulk_create(
+        MonthlyPostCount(month=month, post_count=total)
+        for month, total in Post.objects.filter(
+            is_published=True,
+            is_deleted=False,
+            category__is_published=True,
+        ).annotate(
+            month=TruncMonth('pub_date', output_field=models.DateField())
+        ).order_by().values('month').annotate(
+            total=Count('pk')
+        ).values_list('month', 'total'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_location_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyPostCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(unique=True, verbose_name='Месяц')),
+                ('post_count', models.PositiveIntegerField(verbose_name='Публикаций')),
+            ],
+            options={
+                'verbose_name': 'публикации за месяц',
+                'verbose_name_plural': 'Публикации по месяцам',
+                'ordering': ('-month',),
+            },
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_monthly_post_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SitemapShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section', models.CharField(max_length=20, verbose_name='Раздел')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер')),
+                ('changed_at', models.DateTimeField(help_text='Время последнего изменения объектов диапазона.', verbose_name='Изменён')),
+                ('generated_at', models.DateTimeField(null=True, verbose_name='Сформирован')),
+                ('expires_at', models.DateTimeField(help_text='Дата ближайшей отложенной публикации диапазона.', null=True, verbose_name='Устареет')),
+            ],
+            options={
+                'verbose_name': 'файл карты сайта',
+                'verbose_name_plural': 'Файлы карты сайта',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sitemapshard',
+            constraint=models.UniqueConstraint(fields=('section', 'number'), name='sitemap_shard_unique'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:29
+
+from django.db import migrations, models
+
+
+def fill_updated_at(apps, schema_editor):
+    """Существующие объекты считаются не изменявшимися после создания"""
+    for name in ('Category', 'Location', 'Post'):
+        apps.get_model('blog', name).objects.update(
+            updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_sitemap_shard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='location',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменено'),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.16 on 2026-10-19 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisibilityJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category_id', models.PositiveBigIntegerField(verbose_name='ID категории')),
+                ('last_post_id', models.PositiveBigIntegerField(default=0, verbose_name='Последняя обработанная публикация')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+            ],
+            options={
+                'verbose_name': 'обновление видимости',
+                'verbose_name_plural': 'Обновления видимости',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='visibilityjob',
+            index=models.Index(fields=['finished_at', 'created_at'], name='visibility_job_pending_idx'),
+        ),
+    ]
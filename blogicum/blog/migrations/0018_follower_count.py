@@ -0,0 +1,42 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def fill_counts(apps, schema_editor):
+    Follow = apps.get_model('blog', 'Follow')
+    FollowerCount = apps.get_model('blog', 'FollowerCount')
+    FollowerCount.objects.bulk_create(
+        FollowerCount(author_id=author_id, followers=total)
+        for author_id, total in Follow.objects.order_by().values(
+            'author_id'
+        ).annotate(total=Count('pk')).values_list('author_id', 'total'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('blog', '0017_visibility_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowerCount',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='follower_count', serialize=False, to='auth.user', verbose_name='Автор')),
+                ('followers', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+            ],
+            options={
+                'verbose_name': 'число подписчиков',
+                'verbose_name_plural': 'Число подписчиков',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='followercount',
+            index=models.Index(fields=['followers'], name='follower_count_idx'),
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
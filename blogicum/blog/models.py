@@ -1,8 +1,14 @@
 from django.contrib.auth import get_user_model
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
+from . import geo
+
 User = get_user_model()
+# Число цифр на один уровень пути комментария, хватает для 64-битного id.
+COMMENT_PATH_STEP = 19
 TEXT_LENGTH = 256
+TAG_LENGTH = 50
 
 
 class BaseModel(models.Model):
@@ -15,6 +21,11 @@ class BaseModel(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    # В update() время изменения нужно передавать явно.
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         abstract = True
@@ -33,15 +44,89 @@ class Category(BaseModel):
     class Meta:
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
+        indexes = (
+            models.Index(fields=('title',), name='category_title_idx'),
+        )
+
+    def __str__(self) -> str:
+        return self.title
 
 
 class Location(BaseModel):
     name = models.CharField(max_length=TEXT_LENGTH,
                             verbose_name='Название места')
+    latitude = models.FloatField(
+        'Широта',
+        null=True,
+        blank=True,
+        validators=(MinValueValidator(-90), MaxValueValidator(90)),
+    )
+    longitude = models.FloatField(
+        'Долгота',
+        null=True,
+        blank=True,
+        validators=(MinValueValidator(-180), MaxValueValidator(180)),
+    )
+    geohash = models.CharField(
+        'Geohash',
+        max_length=geo.PRECISION,
+        blank=True,
+        editable=False,
+        help_text='Вычисляется по координатам при сохранении.'
+    )
 
     class Meta:
         verbose_name = 'местоположение'
         verbose_name_plural = 'Местоположения'
+        indexes = (
+            models.Index(fields=('name',), name='location_name_idx'),
+            models.Index(fields=('geohash',), name='location_geohash_idx'),
+        )
+
+    def __str__(self) -> str:
+        return self.name
+
+    def save(self, *args, **kwargs):
+        if self.latitude is None or self.longitude is None:
+            self.geohash = ''
+        else:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and (
+                {'latitude', 'longitude'} & set(update_fields)):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        super().save(*args, **kwargs)
+
+
+class Tag(models.Model):
+    name = models.CharField('Название', max_length=TAG_LENGTH, unique=True)
+    slug = models.SlugField(
+        'Идентификатор',
+        max_length=TAG_LENGTH,
+        unique=True,
+        allow_unicode=True,
+    )
+    post_count = models.PositiveIntegerField(
+        'Видимых публикаций',
+        default=0,
+        editable=False,
+        help_text='Пересчитывается при изменении тегов и видимости '
+                  'публикаций.'
+    )
+
+    class Meta:
+        verbose_name = 'тег'
+        verbose_name_plural = 'Теги'
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class PostManager(models.Manager):
+    """Публикации без помеченных на удаление"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
 
 
 class Post(BaseModel):
@@ -73,10 +158,42 @@ class Post(BaseModel):
         verbose_name='Категория',
         related_name='posts'
     )
+    is_deleted = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Удалено',
+        help_text='Публикация скрыта и ждёт фонового удаления.'
+    )
+    views = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Просмотры',
+        help_text='Обновляется пачками, может отставать на несколько секунд.'
+    )
+    tags = models.ManyToManyField(
+        Tag,
+        through='PostTag',
+        blank=True,
+        verbose_name='Теги',
+        related_name='posts',
+    )
+
+    objects = PostManager()
+    all_objects = models.Manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(fields=('pub_date',), name='post_pub_date_idx'),
+            models.Index(fields=('is_published', 'pub_date'),
+                         name='post_published_pub_date_idx'),
+            models.Index(fields=('author', 'pub_date'),
+                         name='post_author_pub_date_idx'),
+        )
+
+    def __str__(self) -> str:
+        return self.title
 
 
 class Comment(models.Model):
@@ -89,11 +206,370 @@ class Comment(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name='Ответ на комментарий',
+        related_name='replies',
+    )
+    path = models.CharField(
+        'Путь в ветке',
+        max_length=255,
+        blank=True,
+        editable=False,
+        help_text='id предков и самого комментария по '
+                  f'{COMMENT_PATH_STEP} цифр',
+    )
 
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(fields=('post', 'created_at'),
+                         name='comment_post_created_at_idx'),
+            models.Index(fields=('post', 'path'),
+                         name='comment_post_path_idx'),
+        )
 
     def __str__(self) -> str:
         return self.text
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            # Путь содержит id комментария, поэтому известен только после
+            # вставки строки.
+            prefix = self.parent.path if self.parent else ''
+            self.path = prefix + str(self.pk).zfill(COMMENT_PATH_STEP)
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+    @property
+    def depth(self):
+        """Уровень вложенности: 0 у комментария к публикации"""
+        return len(self.path) // COMMENT_PATH_STEP - 1
+
+    @staticmethod
+    def subtree_end(path):
+        """Граница, до которой в порядке path идут потомки комментария"""
+        # ':' следует за '9', поэтому path + ':' больше путей всех потомков.
+        return path + ':'
+
+
+class PostTag(models.Model):
+    """Тег публикации с копией её даты и видимости для ленты тега"""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+        related_name='post_tags',
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        verbose_name='Тег',
+        related_name='post_tags',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+    is_visible = models.BooleanField(
+        'Видна в ленте',
+        help_text='Публикация и её категория опубликованы, публикация не '
+                  'удалена.'
+    )
+
+    class Meta:
+        verbose_name = 'тег публикации'
+        verbose_name_plural = 'Теги публикаций'
+        constraints = (
+            models.UniqueConstraint(fields=('post', 'tag'),
+                                    name='post_tag_unique'),
+        )
+        indexes = (
+            models.Index(fields=('tag', 'is_visible', 'pub_date'),
+                         name='post_tag_feed_idx'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.post_id}: {self.tag_id}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Подписчик',
+        related_name='follows',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Автор',
+        related_name='followers',
+    )
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(fields=('user', 'author'),
+                                    name='follow_unique'),
+            models.CheckConstraint(check=~models.Q(user=models.F('author')),
+                                   name='follow_not_self'),
+        )
+        indexes = (
+            models.Index(fields=('author', 'user'),
+                         name='follow_author_user_idx'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.user} → {self.author}'
+
+
+class FollowerCount(models.Model):
+    """Число подписчиков автора; обновляется сигналами Follow"""
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        verbose_name='Автор',
+        related_name='follower_count',
+    )
+    followers = models.PositiveIntegerField('Подписчиков', default=0)
+
+    class Meta:
+        verbose_name = 'число подписчиков'
+        verbose_name_plural = 'Число подписчиков'
+        indexes = (
+            models.Index(fields=('followers',),
+                         name='follower_count_idx'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.author_id}: {self.followers}'
+
+
+class TimelineEntry(models.Model):
+    """Публикация в материализованной ленте подписчика"""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Читатель',
+        related_name='timeline_entries',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+        related_name='timeline_entries',
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'Записи лент'
+        constraints = (
+            models.UniqueConstraint(fields=('user', 'post'),
+                                    name='timeline_entry_unique'),
+        )
+        indexes = (
+            models.Index(fields=('user', 'pub_date', 'post'),
+                         name='timeline_user_pub_date_idx'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.user_id}: {self.post_id}'
+
+
+class FanoutJob(models.Model):
+    """Рассылка новой публикации в ленты подписчиков автора"""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+    )
+    last_follow_id = models.PositiveBigIntegerField(
+        'Последняя обработанная подписка', default=0)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    finished_at = models.DateTimeField('Завершено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'рассылка в ленты'
+        verbose_name_plural = 'Рассылки в ленты'
+        indexes = (
+            models.Index(fields=('finished_at', 'created_at'),
+                         name='fanout_job_pending_idx'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.post_id}'
+
+
+class ReaderSketch(models.Model):
+    """HyperLogLog-регистры уникальных читателей публикации, автора
+       или категории"""
+
+    POST = 'post'
+    AUTHOR = 'author'
+    CATEGORY = 'category'
+    SCOPES = (
+        (POST, 'Публикация'),
+        (AUTHOR, 'Автор'),
+        (CATEGORY, 'Категория'),
+    )
+
+    scope = models.CharField('Область', max_length=20, choices=SCOPES)
+    object_id = models.PositiveBigIntegerField('ID объекта')
+    registers = models.BinaryField('Регистры')
+
+    class Meta:
+        verbose_name = 'счётчик уникальных читателей'
+        verbose_name_plural = 'Счётчики уникальных читателей'
+        constraints = (
+            models.UniqueConstraint(fields=('scope', 'object_id'),
+                                    name='reader_sketch_unique'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.scope} #{self.object_id}'
+
+
+class PostActivity(models.Model):
+    """Просмотры и комментарии публикации за окно TRENDING_WINDOW"""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+        related_name='activity',
+    )
+    window = models.DateTimeField('Начало окна')
+    views = models.PositiveIntegerField('Просмотры', default=0)
+    comments = models.PositiveIntegerField('Комментарии', default=0)
+
+    class Meta:
+        verbose_name = 'активность публикации'
+        verbose_name_plural = 'Активность публикаций'
+        constraints = (
+            models.UniqueConstraint(fields=('window', 'post'),
+                                    name='post_activity_unique'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.post_id} @ {self.window}'
+
+
+class TrendingPost(models.Model):
+    """Место публикации в рейтинге популярного"""
+
+    position = models.PositiveIntegerField('Место', primary_key=True)
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+        related_name='trending',
+    )
+    score = models.FloatField('Рейтинг')
+
+    class Meta:
+        verbose_name = 'популярная публикация'
+        verbose_name_plural = 'Популярные публикации'
+        ordering = ('position',)
+
+    def __str__(self) -> str:
+        return f'{self.position}. {self.post_id}'
+
+
+class MonthlyPostCount(models.Model):
+    """Число видимых публикаций за месяц для архива"""
+
+    month = models.DateField('Месяц', unique=True)
+    post_count = models.PositiveIntegerField('Публикаций')
+
+    class Meta:
+        verbose_name = 'публикации за месяц'
+        verbose_name_plural = 'Публикации по месяцам'
+        ordering = ('-month',)
+
+    def __str__(self) -> str:
+        return f'{self.month:%Y-%m}: {self.post_count}'
+
+
+class SitemapShard(models.Model):
+    """Файл карты сайта: раздел и номер диапазона id"""
+
+    section = models.CharField('Раздел', max_length=20)
+    number = models.PositiveIntegerField('Номер')
+    changed_at = models.DateTimeField(
+        'Изменён',
+        help_text='Время последнего изменения объектов диапазона.'
+    )
+    generated_at = models.DateTimeField('Сформирован', null=True)
+    expires_at = models.DateTimeField(
+        'Устареет',
+        null=True,
+        help_text='Дата ближайшей отложенной публикации диапазона.'
+    )
+
+    class Meta:
+        verbose_name = 'файл карты сайта'
+        verbose_name_plural = 'Файлы карты сайта'
+        constraints = (
+            models.UniqueConstraint(fields=('section', 'number'),
+                                    name='sitemap_shard_unique'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.section}-{self.number}'
+
+
+class DeletionJob(models.Model):
+    model = models.CharField('Модель', max_length=100)
+    object_id = models.PositiveBigIntegerField('ID объекта')
+    stage = models.CharField('Текущий этап', max_length=50, blank=True)
+    total = models.PositiveBigIntegerField('Всего связанных объектов',
+                                           default=0)
+    processed = models.PositiveBigIntegerField('Удалено связанных объектов',
+                                               default=0)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    finished_at = models.DateTimeField('Завершено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'задача удаления'
+        verbose_name_plural = 'Задачи удаления'
+        indexes = (
+            models.Index(fields=('finished_at', 'created_at'),
+                         name='deletion_job_pending_idx'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.model} #{self.object_id}'
+
+
+class VisibilityJob(models.Model):
+    """Обновление тегов, архива и карты сайта для публикаций категории,
+       у которой изменилась видимость"""
+
+    category_id = models.PositiveBigIntegerField('ID категории')
+    last_post_id = models.PositiveBigIntegerField(
+        'Последняя обработанная публикация', default=0)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    finished_at = models.DateTimeField('Завершено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'обновление видимости'
+        verbose_name_plural = 'Обновления видимости'
+        indexes = (
+            models.Index(fields=('finished_at', 'created_at'),
+                         name='visibility_job_pending_idx'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.category_id}'
@@ -0,0 +1,48 @@
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+ESTIMATE_QUERIES = {
+    'sqlite': ('SELECT stat FROM sqlite_stat1 '
+               'WHERE tbl = %s AND idx IS NULL'),
+    'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+}
+
+
+def estimate_table_rows(queryset):
+    """Оценка числа строк таблицы по статистике СУБД или по максимальному
+       первичному ключу"""
+    connection = connections[queryset.db]
+    sql = ESTIMATE_QUERIES.get(connection.vendor)
+    if sql is not None:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+        except DatabaseError:
+            row = None
+        if row and row[0]:
+            return int(str(row[0]).split()[0])
+    return queryset.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор без COUNT(*) по всей таблице.
+
+    Точно считает не более count_limit строк; для больших таблиц без
+    фильтров (кроме фильтра менеджера модели) берёт оценку, для
+    отфильтрованных выборок — count_limit.
+    """
+
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        count = self.object_list[:self.count_limit].count()
+        if count < self.count_limit:
+            return count
+        manager = self.object_list.model._default_manager
+        if self.object_list.query.where == manager.all().query.where:
+            return max(estimate_table_rows(self.object_list), count)
+        return count
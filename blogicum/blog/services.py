@@ -0,0 +1,299 @@
+import time
+from abc import ABC, abstractmethod
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    Category, Comment, DeletionJob, Follow, Location, Post, ReaderSketch,
+    TimelineEntry, User, VisibilityJob
+)
+from .signals import content_changed
+from .archive import refresh_archive
+from .sitemaps import CategorySection, mark_changed, mark_posts_changed
+from .tags import refresh_tag_visibility
+
+CHUNK_SIZE = 1000
+
+
+def refresh_visibility(posts):
+    """Обновление зависящих от видимости публикаций тегов, архива и
+       карты сайта"""
+    refresh_tag_visibility(posts)
+    refresh_archive(posts)
+    mark_posts_changed(posts)
+
+
+def iter_pk_chunks(queryset, chunk_size=CHUNK_SIZE):
+    """Первичные ключи выборки пачками, с продвижением по индексу pk"""
+    last_pk = None
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(
+            pk__gt=last_pk)
+        pks = list(chunk[:chunk_size])
+        if not pks:
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def set_published(queryset, is_published, chunk_size=CHUNK_SIZE):
+    """Публикация или снятие с публикации пачками update().
+
+    Вместо сигнала на каждую строку отправляется одно событие
+    content_changed. Возвращает число изменённых объектов.
+    """
+    model = queryset.model
+    updated = 0
+    for pks in iter_pk_chunks(
+            queryset.exclude(is_published=is_published), chunk_size):
+        with transaction.atomic():
+            updated += model.objects.filter(pk__in=pks).update(
+                is_published=is_published, updated_at=timezone.now())
+            if model is Post:
+                refresh_visibility(Post.all_objects.filter(pk__in=pks))
+            elif model is Category:
+                # Публикации категорий обновляет run_visibility_jobs.
+                VisibilityJob.objects.bulk_create(
+                    VisibilityJob(category_id=pk) for pk in pks)
+                mark_changed(CategorySection.name, [0])
+    if updated:
+        content_changed.send(sender=model, count=updated)
+    return updated
+
+
+def run_visibility_jobs(chunk_size=CHUNK_SIZE, pause=0):
+    """Обновление публикаций категорий, сменивших видимость, пачками.
+
+    Каждая пачка обновляется в своей транзакции, продвижение по
+    публикациям сохраняется в задаче. Возвращает число завершённых задач.
+    """
+    finished = 0
+    jobs = VisibilityJob.objects.filter(finished_at__isnull=True)
+    job_ids = list(jobs.order_by('created_at').values_list('pk', flat=True))
+    for job_id in job_ids:
+        job = jobs.filter(pk=job_id).first()
+        if job is None:
+            continue
+        posts = Post.all_objects.filter(
+            category_id=job.category_id, pk__gt=job.last_post_id)
+        for pks in iter_pk_chunks(posts, chunk_size):
+            with transaction.atomic():
+                refresh_visibility(Post.all_objects.filter(pk__in=pks))
+                job.last_post_id = pks[-1]
+                job.save(update_fields=('last_post_id',))
+            time.sleep(pause)
+        job.finished_at = timezone.now()
+        job.save(update_fields=('finished_at',))
+        finished += 1
+    return finished
+
+
+class Deletion(ABC):
+    """Удаление объекта: немедленное скрытие и фоновая очистка пачками.
+
+    Каждый этап удаляет или обновляет только оставшиеся строки, поэтому
+    прерванная задача продолжается с того же этапа.
+    """
+
+    model = None
+    # Область счётчиков уникальных читателей удаляемого объекта.
+    sketch_scope = None
+
+    @abstractmethod
+    def hide(self, obj):
+        pass
+
+    def count(self, obj):
+        return 0
+
+    @abstractmethod
+    def purge(self, job, chunk_size, pause):
+        pass
+
+    def start_stage(self, job, stage):
+        job.stage = stage
+        job.save(update_fields=('stage',))
+
+
+class PostDeletion(Deletion):
+    model = Post
+    sketch_scope = ReaderSketch.POST
+
+    def hide(self, post):
+        posts = Post.all_objects.filter(pk=post.pk)
+        posts.update(is_deleted=True, updated_at=timezone.now())
+        refresh_visibility(posts)
+
+    def count(self, post):
+        return (Comment.objects.filter(post=post).count()
+                + TimelineEntry.objects.filter(post=post).count())
+
+    def purge(self, job, chunk_size, pause):
+        self.start_stage(job, 'comments')
+        delete_in_chunks(job, Comment.objects.filter(post_id=job.object_id),
+                         chunk_size, pause)
+        self.start_stage(job, 'timelines')
+        delete_in_chunks(
+            job, TimelineEntry.objects.filter(post_id=job.object_id),
+            chunk_size, pause)
+        Post.all_objects.filter(pk=job.object_id).delete()
+
+
+class DetachPostsDeletion(Deletion):
+    """Категория или местоположение: у публикаций связь обнуляется"""
+
+    field = None
+
+    def hide(self, obj):
+        obj.is_published = False
+        obj.save(update_fields=('is_published',))
+
+    def count(self, obj):
+        return Post.all_objects.filter(**{self.field: obj}).count()
+
+    def purge(self, job, chunk_size, pause):
+        self.start_stage(job, 'posts')
+        posts = Post.all_objects.filter(**{f'{self.field}_id': job.object_id})
+        for pks in iter_pk_chunks(posts, chunk_size):
+            with transaction.atomic():
+                posts = Post.all_objects.filter(pk__in=pks)
+                posts.update(updated_at=timezone.now(), **{self.field: None})
+                refresh_visibility(posts)
+                job.processed += len(pks)
+                job.save(update_fields=('processed',))
+            time.sleep(pause)
+        self.model.objects.filter(pk=job.object_id).delete()
+
+
+class CategoryDeletion(DetachPostsDeletion):
+    model = Category
+    sketch_scope = ReaderSketch.CATEGORY
+    field = 'category'
+
+
+class LocationDeletion(DetachPostsDeletion):
+    model = Location
+    field = 'location'
+
+
+class UserDeletion(Deletion):
+    model = User
+    sketch_scope = ReaderSketch.AUTHOR
+
+    def hide(self, user):
+        user.is_active = False
+        user.save(update_fields=('is_active',))
+
+    def get_follows(self, user_id):
+        return Follow.objects.filter(Q(user_id=user_id) | Q(author_id=user_id))
+
+    def count(self, user):
+        # Комментарии к своим публикациям удаляются вместе с остальными
+        # комментариями пользователя и считаются один раз.
+        return (Post.all_objects.filter(author=user).count()
+                + Comment.objects.filter(author=user).count()
+                + Comment.objects.filter(post__author=user).exclude(
+                    author=user).count()
+                + self.get_follows(user.pk).count()
+                + TimelineEntry.objects.filter(user=user).count())
+
+    def purge(self, job, chunk_size, pause):
+        posts = Post.all_objects.filter(author_id=job.object_id)
+        self.start_stage(job, 'hide_posts')
+        for pks in iter_pk_chunks(posts.filter(is_deleted=False),
+                                  chunk_size):
+            with transaction.atomic():
+                hidden = Post.all_objects.filter(pk__in=pks)
+                hidden.update(is_deleted=True, updated_at=timezone.now())
+                refresh_visibility(hidden)
+            time.sleep(pause)
+
+        self.start_stage(job, 'comments')
+        delete_in_chunks(job, Comment.objects.filter(author_id=job.object_id),
+                         chunk_size, pause)
+
+        self.start_stage(job, 'follows')
+        delete_in_chunks(job, self.get_follows(job.object_id),
+                         chunk_size, pause)
+
+        self.start_stage(job, 'timeline')
+        delete_in_chunks(
+            job, TimelineEntry.objects.filter(user_id=job.object_id),
+            chunk_size, pause)
+
+        self.start_stage(job, 'posts')
+        for pks in iter_pk_chunks(posts, chunk_size):
+            delete_in_chunks(job, Comment.objects.filter(post_id__in=pks),
+                             chunk_size, pause)
+            with transaction.atomic():
+                Post.all_objects.filter(pk__in=pks).delete()
+                ReaderSketch.objects.filter(
+                    scope=ReaderSketch.POST, object_id__in=pks).delete()
+                job.processed += len(pks)
+                job.save(update_fields=('processed',))
+            time.sleep(pause)
+        User.objects.filter(pk=job.object_id).delete()
+
+
+def delete_in_chunks(job, queryset, chunk_size, pause):
+    """Удаление выборки пачками с сохранением прогресса в задаче"""
+    for pks in iter_pk_chunks(queryset, chunk_size):
+        with transaction.atomic():
+            queryset.model.objects.filter(pk__in=pks).delete()
+            job.processed += len(pks)
+            job.save(update_fields=('processed',))
+        time.sleep(pause)
+
+
+DELETIONS = {
+    deletion.model._meta.label_lower: deletion
+    for deletion in (
+        PostDeletion(), CategoryDeletion(), LocationDeletion(),
+        UserDeletion(),
+    )
+}
+
+
+def schedule_deletion(obj):
+    """Немедленное скрытие объекта и постановка его удаления в очередь"""
+    label = obj._meta.label_lower
+    deletion = DELETIONS[label]
+    # Подсчёт читает много строк, поэтому выполняется до транзакции и
+    # не держит блокировку записи.
+    total = deletion.count(obj)
+    with transaction.atomic():
+        deletion.hide(obj)
+        DeletionJob.objects.create(model=label, object_id=obj.pk, total=total)
+    content_changed.send(sender=type(obj), count=1)
+
+
+def run_deletion_jobs(chunk_size=CHUNK_SIZE, pause=0):
+    """Выполнение незавершённых задач удаления.
+
+    Каждая пачка удаляется в своей транзакции, поэтому запись в базу
+    блокируется не дольше одной пачки; прерванная задача продолжается
+    с места остановки. Возвращает число завершённых задач.
+    """
+    finished = 0
+    jobs = DeletionJob.objects.filter(finished_at__isnull=True)
+    # Задачи сохраняются по ходу выполнения, поэтому сначала читаются
+    # только id, а каждая задача загружается перед выполнением.
+    job_ids = list(jobs.order_by('created_at').values_list('pk', flat=True))
+    for job_id in job_ids:
+        job = jobs.filter(pk=job_id).first()
+        if job is None:
+            continue
+        deletion = DELETIONS[job.model]
+        deletion.purge(job, chunk_size, pause)
+        if deletion.sketch_scope:
+            ReaderSketch.objects.filter(
+                scope=deletion.sketch_scope, object_id=job.object_id
+            ).delete()
+        job.stage = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=('stage', 'finished_at'))
+        finished += 1
+    return finished
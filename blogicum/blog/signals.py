@@ -0,0 +1,135 @@
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.db.models import F
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .backends import get_user_cache_key
+from .models import (
+    Category, Comment, Follow, FollowerCount, Post, User, VisibilityJob,
+)
+from .archive import change_month_count, get_month
+from .sitemaps import (
+    CategorySection, PostSection, ProfileSection, get_shard_size,
+    mark_changed
+)
+from .tags import refresh_tag_visibility
+
+CONTENT_VERSION_KEY = 'blog-content-version'
+
+# Одно событие на массовое изменение публикаций, категорий или мест;
+# аргумент count — число изменённых объектов.
+content_changed = Signal()
+
+
+def get_content_version():
+    """Версия опубликованного контента для ключей кэша"""
+    return cache.get_or_set(CONTENT_VERSION_KEY, time.time_ns, None)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    cache.delete(get_user_cache_key(instance.pk))
+
+
+@receiver(content_changed)
+def invalidate_content_cache(sender, **kwargs):
+    cache.set(CONTENT_VERSION_KEY, time.time_ns(), None)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_commented_post(sender, instance, **kwargs):
+    """Комментарии выводятся на странице публикации, поэтому их
+       изменение обновляет время изменения публикации"""
+    Post.all_objects.filter(pk=instance.post_id).update(
+        updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        FollowerCount.objects.bulk_create(
+            [FollowerCount(author_id=instance.author_id)],
+            ignore_conflicts=True)
+        FollowerCount.objects.filter(author_id=instance.author_id).update(
+            followers=F('followers') + 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_unfollow(sender, instance, **kwargs):
+    FollowerCount.objects.filter(
+        author_id=instance.author_id, followers__gt=0
+    ).update(followers=F('followers') - 1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Category)
+def content_saved(sender, **kwargs):
+    content_changed.send(sender=sender, count=1)
+
+
+def get_post_state(pk):
+    """Видимость и дата публикации, от которых зависят теги и архив"""
+    row = Post.all_objects.filter(pk=pk).values_list(
+        'is_published', 'is_deleted', 'category__is_published', 'pub_date'
+    ).first()
+    if row is None:
+        return None
+    is_published, is_deleted, category_published, pub_date = row
+    return (is_published and not is_deleted and bool(category_published),
+            pub_date)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    instance._saved_state = (
+        get_post_state(instance.pk) if instance.pk else None)
+
+
+@receiver(post_save, sender=Post)
+def refresh_post_rollups(sender, instance, created, **kwargs):
+    """Теги и счётчики архива меняются, только если изменились
+       видимость или дата публикации; месяцы — на ±1"""
+    old = getattr(instance, '_saved_state', None)
+    new = get_post_state(instance.pk)
+    if old != new:
+        if not created:
+            refresh_tag_visibility(Post.all_objects.filter(pk=instance.pk))
+        old_month, new_month = (
+            get_month(state[1]) if state and state[0] else None
+            for state in (old, new)
+        )
+        if old_month != new_month:
+            if old_month:
+                change_month_count(old_month, -1)
+            if new_month:
+                change_month_count(new_month, 1)
+    mark_changed(PostSection.name, [instance.pk // get_shard_size()])
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_visibility(sender, instance, **kwargs):
+    instance._was_published = Category.objects.filter(
+        pk=instance.pk).values_list('is_published', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def refresh_category_rollups(sender, instance, created, **kwargs):
+    """Публикации категории обновляются фоновой задачей и только при
+       смене видимости: их может быть сколько угодно"""
+    was_published = getattr(instance, '_was_published', None)
+    if (not created and was_published is not None
+            and was_published != instance.is_published):
+        VisibilityJob.objects.create(category_id=instance.pk)
+    mark_changed(CategorySection.name, [0])
+
+
+@receiver(post_save, sender=User)
+def mark_profile_changed(sender, instance, update_fields=None, **kwargs):
+    # Вход пользователя обновляет только last_login.
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        mark_changed(ProfileSection.name, [instance.pk // get_shard_size()])
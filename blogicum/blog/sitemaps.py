@@ -0,0 +1,249 @@
+"""Карта сайта из файлов по SITEMAP_SHARD_SIZE адресов.
+
+Публикации и профили делятся на файлы по диапазонам id. Файл пишется
+на диск потоково и формируется заново, только если объекты его
+диапазона изменились (mark_changed) или наступила дата отложенной
+публикации. Адреса в файлах хранятся без домена, он добавляется при
+отдаче.
+"""
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import F, Max
+from django.urls import NoReverseMatch, reverse
+from django.utils import timezone
+
+from .models import Category, Post, SitemapShard, User
+from .tags import get_visible_posts
+
+ITERATOR_CHUNK_SIZE = 2000
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+URLSET_START = ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<urlset xmlns="{XMLNS}">\n')
+URLSET_END = '</urlset>\n'
+LOCATION_START = '<url><loc>'
+
+logger = logging.getLogger(__name__)
+
+
+class Section(ABC):
+    """Раздел карты сайта; get_rows выдаёт (адрес, дата изменения)"""
+
+    name = None
+    # Разделы без деления на диапазоны состоят из одного файла 0.
+    sharded = True
+
+    @abstractmethod
+    def get_queryset(self):
+        pass
+
+    def get_shard_count(self):
+        if not self.sharded:
+            return 1
+        max_pk = self.get_queryset().aggregate(max_pk=Max('pk'))['max_pk']
+        return 0 if max_pk is None else max_pk // get_shard_size() + 1
+
+    def filter_shard(self, queryset, number):
+        """Объекты диапазона id файла number"""
+        if not self.sharded:
+            return queryset
+        size = get_shard_size()
+        return queryset.filter(pk__gte=number * size,
+                               pk__lt=(number + 1) * size)
+
+    @abstractmethod
+    def get_rows(self, number):
+        pass
+
+    def get_expiry(self, number):
+        """Когда файл устареет без изменений в базе"""
+        return None
+
+
+class PostSection(Section):
+    name = 'posts'
+
+    def get_queryset(self):
+        return Post.all_objects.all()
+
+    def get_rows(self, number):
+        posts = self.filter_shard(get_visible_posts(), number).filter(
+            pub_date__lte=timezone.now()
+        ).order_by('pk').values_list('pk', 'updated_at')
+        for pk, updated_at in posts.iterator(ITERATOR_CHUNK_SIZE):
+            yield reverse('blog:post_detail', args=(pk,)), updated_at
+
+    def get_expiry(self, number):
+        return self.filter_shard(get_visible_posts(), number).filter(
+            pub_date__gt=timezone.now()
+        ).order_by('pub_date').values_list('pub_date', flat=True).first()
+
+
+class ProfileSection(Section):
+    name = 'profiles'
+
+    def get_queryset(self):
+        return User.objects.all()
+
+    def get_rows(self, number):
+        users = self.filter_shard(
+            self.get_queryset().filter(is_active=True), number
+        ).order_by('pk').values_list('username', flat=True)
+        for username in users.iterator(ITERATOR_CHUNK_SIZE):
+            # Имена с символами вне slug (john.doe, a@b) допустимы
+            # в User, но у таких профилей нет адреса.
+            try:
+                location = reverse('blog:profile', args=(username,))
+            except NoReverseMatch:
+                logger.info('Профиль %r пропущен в карте сайта', username)
+                continue
+            yield location, None
+
+
+class CategorySection(Section):
+    name = 'categories'
+    sharded = False
+
+    def get_queryset(self):
+        return Category.objects.all()
+
+    def get_rows(self, number):
+        categories = self.get_queryset().filter(
+            is_published=True).order_by('pk').values_list('slug', 'updated_at')
+        for slug, updated_at in categories.iterator(ITERATOR_CHUNK_SIZE):
+            yield reverse('blog:category_posts', args=(slug,)), updated_at
+
+
+SECTIONS = {
+    section.name: section
+    for section in (CategorySection(), PostSection(), ProfileSection())
+}
+
+
+def get_shard_size():
+    return settings.SITEMAP_SHARD_SIZE
+
+
+def mark_changed(section, numbers):
+    """Отметка изменения объектов в файлах раздела"""
+    numbers = set(numbers)
+    if not numbers:
+        return
+    now = timezone.now()
+    shards = SitemapShard.objects.filter(section=section, number__in=numbers)
+    shards.update(changed_at=now)
+    SitemapShard.objects.bulk_create(
+        [
+            SitemapShard(section=section, number=number, changed_at=now)
+            for number in numbers - set(
+                shards.values_list('number', flat=True))
+        ],
+        ignore_conflicts=True)
+
+
+def mark_posts_changed(posts):
+    """Отметка файлов, в которые попадают публикации выборки"""
+    mark_changed(PostSection.name, posts.order_by().annotate(
+        shard=F('pk') / get_shard_size()
+    ).values_list('shard', flat=True).distinct())
+
+
+def get_shard_path(section, number):
+    return os.path.join(settings.SITEMAP_CACHE_DIR, f'{section}-{number}.xml')
+
+
+def is_fresh(shard, path):
+    now = timezone.now()
+    return (
+        shard.generated_at is not None
+        and shard.generated_at >= shard.changed_at
+        and (shard.expires_at is None or shard.expires_at > now)
+        and os.path.exists(path)
+    )
+
+
+def write_shard(section, number, path):
+    """Потоковая запись файла без загрузки раздела в память"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    file = tempfile.NamedTemporaryFile(
+        'w', encoding='utf-8', dir=os.path.dirname(path), delete=False)
+    try:
+        with file:
+            file.write(URLSET_START)
+            for location, lastmod in section.get_rows(number):
+                file.write(f'{LOCATION_START}{escape(location)}</loc>')
+                if lastmod is not None:
+                    file.write(f'<lastmod>{lastmod.isoformat()}</lastmod>')
+                file.write('</url>\n')
+            file.write(URLSET_END)
+        os.replace(file.name, path)
+    except Exception:
+        os.remove(file.name)
+        raise
+
+
+def get_shard_file(section_name, number):
+    """Путь к актуальному файлу раздела; устаревший формируется заново.
+
+    Время формирования берётся до чтения базы: изменения во время
+    записи оставят файл устаревшим.
+    """
+    section = SECTIONS[section_name]
+    path = get_shard_path(section_name, number)
+    shard, _ = SitemapShard.objects.get_or_create(
+        section=section_name, number=number,
+        defaults={'changed_at': timezone.now()})
+    if is_fresh(shard, path):
+        return path
+    started = timezone.now()
+    write_shard(section, number, path)
+    shard.generated_at = started
+    shard.expires_at = section.get_expiry(number)
+    shard.save(update_fields=('generated_at', 'expires_at'))
+    return path
+
+
+def iter_shard(path, base_url):
+    """Строки файла с доменом в адресах"""
+    prefix = LOCATION_START + escape(base_url)
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            yield line.replace(LOCATION_START, prefix, 1)
+
+
+def iter_index(base_url):
+    """Индекс карты сайта: все файлы всех разделов"""
+    lastmods = {
+        (shard.section, shard.number): shard.changed_at
+        for shard in SitemapShard.objects.all()
+    }
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           f'<sitemapindex xmlns="{XMLNS}">\n')
+    for name, section in SECTIONS.items():
+        for number in range(section.get_shard_count()):
+            location = base_url + reverse(
+                'blog:sitemap_section', args=(name, number))
+            yield f'<sitemap><loc>{escape(location)}</loc>'
+            lastmod = lastmods.get((name, number))
+            if lastmod is not None:
+                yield f'<lastmod>{lastmod.isoformat()}</lastmod>'
+            yield '</sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def update_sitemaps():
+    """Формирование всех устаревших файлов; возвращает их число"""
+    updated = 0
+    for name, section in SECTIONS.items():
+        for number in range(section.get_shard_count()):
+            path = get_shard_path(name, number)
+            shard = SitemapShard.objects.filter(
+                section=name, number=number).first()
+            if shard is None or not is_fresh(shard, path):
+                get_shard_file(name, number)
+                updated += 1
+    return updated
@@ -0,0 +1,86 @@
+from django.db.models import (
+    Count, Exists, IntegerField, OuterRef, Subquery, Value
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Post, PostTag, Tag
+
+# Не больше стольких тегов у одной публикации.
+MAX_POST_TAGS = 10
+
+
+def get_visible_posts():
+    """Публикации, которые видны в лентах (дата публикации не учитывается)"""
+    return Post.all_objects.filter(
+        is_published=True,
+        is_deleted=False,
+        category__is_published=True)
+
+
+def recount_tags(tag_ids):
+    """Пересчёт числа видимых публикаций у перечисленных тегов"""
+    visible = PostTag.objects.filter(
+        tag=OuterRef('pk'), is_visible=True
+    ).order_by().values('tag').annotate(total=Count('pk')).values('total')
+    Tag.objects.filter(pk__in=tag_ids).update(post_count=Coalesce(
+        Subquery(visible, output_field=IntegerField()), Value(0)))
+
+
+def count_published(tag):
+    """Число опубликованных к текущему моменту публикаций с тегом.
+
+    Счётчик тега включает отложенные публикации, они вычитаются по
+    диапазону индекса (tag, is_visible, pub_date) после текущего момента.
+    """
+    scheduled = PostTag.objects.filter(
+        tag=tag, is_visible=True, pub_date__gt=timezone.now()).count()
+    return max(tag.post_count - scheduled, 0)
+
+
+def refresh_tag_visibility(posts):
+    """Обновление копий даты и видимости у тегов публикаций одним UPDATE
+       с пересчётом счётчиков затронутых тегов"""
+    links = PostTag.objects.filter(post__in=posts.values('pk'))
+    tag_ids = set(links.values_list('tag_id', flat=True))
+    if not tag_ids:
+        return
+    links.update(
+        is_visible=Exists(get_visible_posts().filter(pk=OuterRef('post'))),
+        pub_date=Subquery(Post.all_objects.filter(
+            pk=OuterRef('post')).values('pub_date')[:1]))
+    recount_tags(tag_ids)
+
+
+def get_tag_slug(name):
+    return slugify(name, allow_unicode=True)
+
+
+def get_or_create_tags(names):
+    """Теги по названиям; названия с одинаковым slug — один тег"""
+    slugs = {get_tag_slug(name): name for name in reversed(names)}
+    tags = {tag.slug: tag for tag in Tag.objects.filter(slug__in=slugs)}
+    for slug, name in slugs.items():
+        if slug not in tags:
+            tags[slug], _ = Tag.objects.get_or_create(
+                slug=slug, defaults={'name': name})
+    return list(tags.values())
+
+
+def set_post_tags(post, names):
+    """Замена тегов публикации; счётчики пересчитываются только
+       у добавленных и удалённых тегов"""
+    tags = get_or_create_tags(names)
+    current = set(post.post_tags.values_list('tag_id', flat=True))
+    wanted = {tag.pk for tag in tags}
+    post.post_tags.filter(tag_id__in=current - wanted).delete()
+    is_visible = get_visible_posts().filter(pk=post.pk).exists()
+    PostTag.objects.bulk_create(
+        [
+            PostTag(post=post, tag=tag, pub_date=post.pub_date,
+                    is_visible=is_visible)
+            for tag in tags if tag.pk not in current
+        ],
+        ignore_conflicts=True)
+    recount_tags(current ^ wanted)
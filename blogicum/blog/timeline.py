@@ -0,0 +1,237 @@
+import heapq
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import FanoutJob, Follow, FollowerCount, Post, TimelineEntry
+from .services import CHUNK_SIZE
+
+CURSOR_SEPARATOR = '_'
+CELEBRITIES_KEY = 'timeline-celebrities'
+
+
+def parse_cursor(value):
+    """Курсор страницы ленты: (pub_date, id) последней показанной
+       публикации; None для первой страницы или неверного значения"""
+    timestamp, _, pk = (value or '').partition(CURSOR_SEPARATOR)
+    try:
+        return datetime.fromisoformat(timestamp), int(pk)
+    except ValueError:
+        return None
+
+
+def format_cursor(post):
+    return f'{post.pub_date.isoformat()}{CURSOR_SEPARATOR}{post.pk}'
+
+
+def before_cursor(cursor, prefix=''):
+    """Условие «публикация раньше курсора» в порядке (-pub_date, -id)"""
+    if cursor is None:
+        return Q()
+    pub_date, pk = cursor
+    return (Q(**{f'{prefix}pub_date__lt': pub_date})
+            | Q(**{f'{prefix}pub_date': pub_date, 'pk__lt': pk}))
+
+
+def get_published_posts():
+    return Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lte=timezone.now())
+
+
+def with_card_data(posts):
+    return posts.select_related(
+        'category', 'location', 'author'
+    ).annotate(comment_count=Count('comments'))
+
+
+def get_feed_page(user, cursor=None, size=10, authors=None):
+    """Страница ленты подписок: слияние публикаций авторов по индексу
+       (author, pub_date).
+
+    Сначала одним запросом выбирается дата последней до курсора
+    публикации каждого автора. На страницу из size публикаций могут
+    попасть только size авторов с самыми свежими публикациями, поэтому
+    второй запрос читает диапазоны индекса лишь этих авторов, сколько бы
+    ни было подписок. authors ограничивает подписки заданными авторами.
+    Возвращает (публикации, курсор следующей страницы).
+    """
+    posts = get_published_posts().filter(before_cursor(cursor))
+    follows = Follow.objects.filter(user=user)
+    if authors is not None:
+        follows = follows.filter(author_id__in=authors)
+    # Для каждой подписки — один поиск по индексу (author, pub_date).
+    heads = list(follows.annotate(
+        latest=Subquery(posts.filter(
+            author=OuterRef('author')
+        ).order_by('-pub_date').values('pub_date')[:1])
+    ).filter(latest__isnull=False).values('author_id', 'latest'))
+    latest = heapq.nlargest(size + 1, heads, key=lambda head: head['latest'])
+    if not latest:
+        return [], None
+    # Авторы с той же датой, что и последний из отобранных, тоже нужны:
+    # порядок внутри одной даты задаёт id.
+    threshold = latest[-1]['latest']
+    authors = [
+        head['author_id'] for head in heads if head['latest'] >= threshold
+    ]
+    page = list(with_card_data(
+        posts.filter(author_id__in=authors)
+    ).order_by('-pub_date', '-pk')[:size + 1])
+    next_cursor = format_cursor(page[size - 1]) if len(page) > size else None
+    return page[:size], next_cursor
+
+
+def get_celebrities():
+    """Авторы, публикации которых не рассылаются по лентам"""
+    def find():
+        # Счётчики подписчиков ведут сигналы Follow: выбираются только
+        # строки знаменитостей по индексу, без агрегации подписок.
+        return set(FollowerCount.objects.filter(
+            followers__gte=settings.TIMELINE_CELEBRITY_FOLLOWERS
+        ).values_list('author_id', flat=True))
+
+    return cache.get_or_set(
+        CELEBRITIES_KEY, find, settings.TIMELINE_CELEBRITY_CACHE_TIMEOUT)
+
+
+def get_timeline_page(user, cursor=None, size=10):
+    """Страница материализованной ленты с публикациями знаменитостей.
+
+    Записи ленты читаются одним диапазоном индекса (user, pub_date,
+    post), публикации авторов из get_celebrities добавляются слиянием
+    при чтении.
+    """
+    entries = list(with_card_data(
+        get_published_posts().filter(
+            before_cursor(cursor, 'timeline_entries__'),
+            timeline_entries__user=user,
+        )
+    ).order_by('-timeline_entries__pub_date', '-pk')[:size + 1])
+    celebrities = get_celebrities()
+    celebrity_posts = []
+    if celebrities:
+        celebrity_posts, _ = get_feed_page(user, cursor, size, celebrities)
+    merged = []
+    seen = set()
+    for post in heapq.merge(
+            entries, celebrity_posts,
+            key=lambda post: (post.pub_date, post.pk), reverse=True):
+        if post.pk not in seen:
+            seen.add(post.pk)
+            merged.append(post)
+    next_cursor = (
+        format_cursor(merged[size - 1]) if len(merged) > size else None
+    )
+    return merged[:size], next_cursor
+
+
+def get_home_page(user, cursor=None, size=10):
+    """Лента подписок: материализованная или собираемая при чтении"""
+    if settings.TIMELINE_FANOUT:
+        return get_timeline_page(user, cursor, size)
+    return get_feed_page(user, cursor, size)
+
+
+def schedule_fanout(post):
+    """Постановка рассылки новой публикации в ленты подписчиков"""
+    if (settings.TIMELINE_FANOUT
+            and post.author_id not in get_celebrities()):
+        FanoutJob.objects.create(post=post)
+
+
+def trim_timelines(user_ids):
+    """Удаление записей сверх TIMELINE_MAX_ENTRIES у переполненных лент"""
+    limit = settings.TIMELINE_MAX_ENTRIES
+    overflowing = TimelineEntry.objects.filter(
+        user_id__in=user_ids
+    ).values('user_id').annotate(entries=Count('pk')).filter(
+        entries__gt=limit
+    ).values_list('user_id', flat=True)
+    for user_id in overflowing:
+        entries = TimelineEntry.objects.filter(user_id=user_id)
+        pub_date, post_id = entries.order_by(
+            '-pub_date', '-post_id'
+        ).values_list('pub_date', 'post_id')[limit - 1]
+        entries.filter(
+            Q(pub_date__lt=pub_date)
+            | Q(pub_date=pub_date, post_id__lt=post_id)
+        ).delete()
+
+
+def run_fanout_jobs(chunk_size=CHUNK_SIZE, pause=0):
+    """Вставка записей лент пачками по chunk_size подписчиков.
+
+    Продвижение по подпискам сохраняется в задаче после каждой пачки,
+    поэтому прерванная рассылка продолжается с места остановки.
+    Возвращает число завершённых задач.
+    """
+    finished = 0
+    jobs = FanoutJob.objects.filter(finished_at__isnull=True)
+    # Задачи сохраняются после каждой пачки, поэтому сначала читаются
+    # только id, а каждая задача загружается перед выполнением.
+    job_ids = list(jobs.order_by('created_at').values_list('pk', flat=True))
+    for job_id in job_ids:
+        job = jobs.filter(pk=job_id).select_related('post').first()
+        if job is None:
+            continue
+        post = job.post
+        followers = Follow.objects.filter(
+            author_id=post.author_id
+        ).order_by('pk').values_list('pk', 'user_id')
+        while True:
+            chunk = list(followers.filter(
+                pk__gt=job.last_follow_id)[:chunk_size])
+            if not chunk:
+                break
+            user_ids = [user_id for _, user_id in chunk]
+            with transaction.atomic():
+                TimelineEntry.objects.bulk_create(
+                    [
+                        TimelineEntry(user_id=user_id, post=post,
+                                      pub_date=post.pub_date)
+                        for user_id in user_ids
+                    ],
+                    ignore_conflicts=True)
+                job.last_follow_id = chunk[-1][0]
+                job.save(update_fields=('last_follow_id',))
+            trim_timelines(user_ids)
+            time.sleep(pause)
+        job.finished_at = timezone.now()
+        job.save(update_fields=('finished_at',))
+        finished += 1
+    return finished
+
+
+def backfill_timeline(user, author):
+    """Последние публикации нового автора в ленте подписчика"""
+    posts = Post.objects.filter(author=author).order_by(
+        '-pub_date').values_list('pk', 'pub_date')
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user=user, post_id=pk, pub_date=pub_date)
+            for pk, pub_date in posts[:settings.TIMELINE_MAX_ENTRIES]
+        ],
+        ignore_conflicts=True)
+    trim_timelines([user.pk])
+
+
+def follow(user, author):
+    """Подписка на автора; повторная подписка ничего не меняет"""
+    if user == author:
+        return
+    _, created = Follow.objects.get_or_create(user=user, author=author)
+    if (created and settings.TIMELINE_FANOUT
+            and author.pk not in get_celebrities()):
+        backfill_timeline(user, author)
+
+
+def unfollow(user, author):
+    Follow.objects.filter(user=user, author=author).delete()
+    TimelineEntry.objects.filter(user=user, post__author=author).delete()
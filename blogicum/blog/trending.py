@@ -0,0 +1,73 @@
+import heapq
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PostActivity, TrendingPost
+from .services import CHUNK_SIZE, iter_pk_chunks
+
+
+def get_window(moment=None):
+    """Начало окна TRENDING_WINDOW, в которое попадает момент"""
+    moment = moment or timezone.now()
+    size = settings.TRENDING_WINDOW.total_seconds()
+    start = moment.timestamp() // size * size
+    return datetime.fromtimestamp(start, dt_timezone.utc)
+
+
+def record_activity(counts, field):
+    """Прибавление счётчиков {id публикации: n} к текущему окну"""
+    window = get_window()
+    PostActivity.objects.bulk_create(
+        [PostActivity(post_id=post_id, window=window) for post_id in counts],
+        ignore_conflicts=True)
+    by_amount = defaultdict(list)
+    for post_id, amount in counts.items():
+        by_amount[amount].append(post_id)
+    for amount, post_ids in by_amount.items():
+        PostActivity.objects.filter(
+            window=window, post_id__in=post_ids
+        ).update(**{field: F(field) + amount})
+
+
+def compute_scores(now=None):
+    """Рейтинг публикаций по окнам горизонта с экспоненциальным
+       затуханием"""
+    now = now or timezone.now()
+    half_life = settings.TRENDING_HALF_LIFE.total_seconds()
+    scores = defaultdict(float)
+    activity = PostActivity.objects.filter(
+        window__gte=now - settings.TRENDING_HORIZON
+    ).values_list('post_id', 'window', 'views', 'comments')
+    for post_id, window, views, comments in activity.iterator():
+        age = max((now - window).total_seconds(), 0)
+        scores[post_id] += (
+            (views + settings.TRENDING_COMMENT_WEIGHT * comments)
+            * 0.5 ** (age / half_life)
+        )
+    return scores
+
+
+def update_trending(chunk_size=CHUNK_SIZE):
+    """Пересчёт таблицы популярного и удаление окон за горизонтом.
+
+    Возвращает число публикаций в рейтинге.
+    """
+    now = timezone.now()
+    top = heapq.nlargest(settings.TRENDING_SIZE,
+                         compute_scores(now).items(),
+                         key=lambda item: item[1])
+    with transaction.atomic():
+        TrendingPost.objects.all().delete()
+        TrendingPost.objects.bulk_create(
+            TrendingPost(position=position, post_id=post_id, score=score)
+            for position, (post_id, score) in enumerate(top, start=1))
+    expired = PostActivity.objects.filter(
+        window__lt=now - settings.TRENDING_HORIZON)
+    for pks in iter_pk_chunks(expired, chunk_size):
+        PostActivity.objects.filter(pk__in=pks).delete()
+    return len(top)
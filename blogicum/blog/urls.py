@@ -1,6 +1,6 @@
 from django.urls import include, path
 
-from . import views
+from . import feeds, views
 
 app_name = 'blog'
 
@@ -26,13 +26,49 @@ profile_urls = [
          views.edit_profile, name='edit_profile'),
     path('<slug:username>/',
          views.profile, name='profile'),
+    path('<slug:username>/rss/',
+         feeds.AuthorPostsFeed(), name='author_rss'),
+    path('<slug:username>/atom/',
+         feeds.AuthorPostsAtomFeed(), name='author_atom'),
+    path('<slug:username>/follow/',
+         views.follow_author, name='follow'),
+    path('<slug:username>/unfollow/',
+         views.unfollow_author, name='unfollow'),
 ]
 
 urlpatterns = [
     path('',
          views.index, name='index'),
+    path('feed/',
+         views.feed, name='feed'),
+    path('trending/',
+         views.trending, name='trending'),
+    path('rss/',
+         feeds.LatestPostsFeed(), name='rss'),
+    path('atom/',
+         feeds.LatestPostsAtomFeed(), name='atom'),
     path('category/<slug:category_slug>/',
          views.category_posts, name='category_posts'),
+    path('category/<slug:category_slug>/rss/',
+         feeds.CategoryPostsFeed(), name='category_rss'),
+    path('category/<slug:category_slug>/atom/',
+         feeds.CategoryPostsAtomFeed(), name='category_atom'),
+    path('archive/<int:year>/',
+         views.archive_posts, name='archive_year'),
+    path('archive/<int:year>/<int:month>/',
+         views.archive_posts, name='archive_month'),
+    path('sitemap.xml',
+         views.sitemap_index, name='sitemap_index'),
+    path('sitemap-<slug:section>-<int:number>.xml',
+         views.sitemap_section, name='sitemap_section'),
+    path('nearby/',
+         views.nearby, name='nearby'),
+    path('tag/<str:tag_slug>/',
+         views.tag_posts, name='tag_posts'),
     path('posts/', include(post_urls)),
     path('profile/', include(profile_urls)),
+    path('autocomplete/category/',
+         views.autocomplete_category, name='autocomplete_category'),
+    path('autocomplete/location/',
+         views.autocomplete_location, name='autocomplete_location'),
 ]
@@ -1,15 +1,37 @@
-from datetime import datetime
+from datetime import date, datetime
 
+from django.conf import settings
 from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count
+from django.db.models import Count, Max, Q
+from django.http import (
+    Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import render, get_object_or_404, redirect
+from django.utils import timezone
 
-from .forms import PostForm, CommentForm, UserForm
-from .models import Post, Category, User, Comment
+from . import geo, sitemaps
+from .archive import get_month_counts, month_range
+from .buffers import post_readers, post_views, unique_readers
+from .conditional import (
+    get_not_modified, latest_timestamp, make_etag, set_validators
+)
+from .forms import PostForm, CommentForm, UserForm, NearbyForm
+from .models import (
+    Post, Category, Location, User, Comment, ReaderSketch, Tag,
+    TimelineEntry
+)
+from .services import schedule_deletion
+from .tags import count_published, set_post_tags
+from .timeline import (
+    follow, get_home_page, parse_cursor, schedule_fanout, unfollow
+)
+from .trending import record_activity
 
 
 NUMBER_OF_PAGINATOR_PAGES = 10
+NUMBER_OF_AUTOCOMPLETE_RESULTS = 20
+NUMBER_OF_COMMENT_THREADS = 10
 
 
 def get_posts(**kwargs):
@@ -23,14 +45,26 @@ def get_posts(**kwargs):
 
 
 def get_paginator(request, queryset,
-                  number_of_pages=NUMBER_OF_PAGINATOR_PAGES):
+                  number_of_pages=NUMBER_OF_PAGINATOR_PAGES, count=None):
     """Представление queryset в виде пагинатора,
-       по N-шт на странице"""
+       по N-шт на странице; count — заранее известное число объектов"""
     paginator = Paginator(queryset, number_of_pages)
+    if count is not None:
+        paginator.count = count
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
+def get_reader_key(request):
+    """Идентификатор читателя для подсчёта уникальных просмотров"""
+    if request.user.is_authenticated:
+        return f'user:{request.user.id}'
+    if request.session.session_key:
+        return f'session:{request.session.session_key}'
+    return 'address:{}:{}'.format(request.META.get('REMOTE_ADDR'),
+                                  request.META.get('HTTP_USER_AGENT'))
+
+
 def index(request):
     """Главная страница / Лента публикаций"""
     posts = get_posts(
@@ -42,6 +76,18 @@ def index(request):
     return render(request, 'blog/index.html', context)
 
 
+def trending(request):
+    """Популярные сейчас публикации по рейтингу update_trending"""
+    posts = get_posts(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lte=datetime.now(),
+        trending__isnull=False,
+    ).order_by('trending__position')
+    context = {'posts': posts}
+    return render(request, 'blog/trending.html', context)
+
+
 def category_posts(request, category_slug):
     """Отображение публикаций в категории"""
     category = get_object_or_404(
@@ -55,27 +101,200 @@ def category_posts(request, category_slug):
         category=category)
     page_obj = get_paginator(request, posts)
     context = {'category': category,
-               'page_obj': page_obj}
+               'page_obj': page_obj,
+               'unique_readers': unique_readers(ReaderSketch.CATEGORY,
+                                                [category.id])}
     return render(request, 'blog/post_list.html', context)
 
 
+def tag_posts(request, tag_slug):
+    """Отображение публикаций с тегом.
+
+    Публикации читаются диапазоном индекса (tag, is_visible, pub_date)
+    по копиям видимости и даты, число страниц берётся из счётчика тега
+    без отложенных публикаций.
+    """
+    tag = get_object_or_404(Tag, slug=tag_slug)
+    posts = get_posts(
+        post_tags__tag=tag,
+        post_tags__is_visible=True,
+        post_tags__pub_date__lte=datetime.now(),
+    ).order_by('-post_tags__pub_date')
+    page_obj = get_paginator(request, posts, count=count_published(tag))
+    context = {'tag': tag,
+               'page_obj': page_obj}
+    return render(request, 'blog/tag.html', context)
+
+
+def get_nearby_locations(latitude, longitude, radius):
+    """Расстояния до опубликованных мест в радиусе, не больше
+       NEARBY_MAX_LOCATIONS ближайших: {id места: км}.
+
+    Кандидаты выбираются диапазонами индекса geohash по покрывающим
+    круг ячейкам, расстояние уточняется по их координатам.
+    """
+    locations = Location.objects.filter(is_published=True).exclude(geohash='')
+    prefixes = geo.covering_prefixes(latitude, longitude, radius)
+    if prefixes:
+        cells = Q()
+        for prefix in prefixes:
+            cells |= Q(geohash__gte=prefix,
+                       geohash__lt=prefix + geo.PREFIX_END)
+        locations = locations.filter(cells)
+    rows = list(locations.values_list('pk', 'latitude', 'longitude'))
+    if not rows:
+        return {}
+    pks, latitudes, longitudes = zip(*rows)
+    distances = geo.distances_km(latitude, longitude, latitudes, longitudes)
+    nearest = sorted(
+        (distance, pk) for pk, distance in zip(pks, distances)
+        if distance <= radius
+    )[:settings.NEARBY_MAX_LOCATIONS]
+    return {pk: distance for distance, pk in nearest}
+
+
+def archive_posts(request, year, month=None):
+    """Публикации за год или месяц со счётчиками месяцев из архива.
+
+    Выборка — диапазон индекса pub_date; для прошедших периодов число
+    страниц берётся из счётчиков, а не из COUNT(*).
+    """
+    try:
+        first = date(year, month or 1, 1)
+        last = date(year, month or 12, 1)
+        start, _ = month_range(first)
+        _, end = month_range(last)
+    except (ValueError, OverflowError):
+        raise Http404
+    posts = get_posts(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lte=datetime.now(),
+        pub_date__gte=start,
+        pub_date__lt=end)
+    months = get_month_counts()
+    count = None
+    if end <= timezone.now():
+        count = sum(
+            counter.post_count for counter in months
+            if first <= counter.month <= last)
+    page_obj = get_paginator(request, posts, count=count)
+    context = {'page_obj': page_obj,
+               'year': year,
+               'month': first if month else None,
+               'months': months}
+    return render(request, 'blog/archive.html', context)
+
+
+def get_base_url(request):
+    return request.build_absolute_uri('/').rstrip('/')
+
+
+def sitemap_index(request):
+    """Индекс карты сайта"""
+    return HttpResponse(
+        ''.join(sitemaps.iter_index(get_base_url(request))),
+        content_type='application/xml')
+
+
+def sitemap_section(request, section, number):
+    """Файл карты сайта из дискового кэша"""
+    if (section not in sitemaps.SECTIONS
+            or number >= sitemaps.SECTIONS[section].get_shard_count()):
+        raise Http404
+    path = sitemaps.get_shard_file(section, number)
+    return StreamingHttpResponse(
+        sitemaps.iter_shard(path, get_base_url(request)),
+        content_type='application/xml')
+
+
+def nearby(request):
+    """Публикации из мест в заданном радиусе от точки"""
+    form = NearbyForm(request.GET or None)
+    context = {'form': form}
+    if form.is_valid():
+        distances = get_nearby_locations(
+            form.cleaned_data['latitude'],
+            form.cleaned_data['longitude'],
+            form.cleaned_data['radius'])
+        posts = get_posts(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=datetime.now(),
+            location__in=list(distances))
+        page_obj = get_paginator(request, posts)
+        for post in page_obj:
+            post.distance = distances[post.location_id]
+        query = request.GET.copy()
+        query.pop('page', None)
+        context.update({'page_obj': page_obj,
+                        'query': query.urlencode()})
+    return render(request, 'blog/nearby.html', context)
+
+
+def get_post_validators(request, post):
+    """ETag и Last-Modified страницы публикации по времени изменения
+       публикации (в том числе её комментариев), категории и места"""
+    changes = (
+        post.updated_at,
+        getattr(post.category, 'updated_at', None),
+        getattr(post.location, 'updated_at', None),
+    )
+    etag = make_etag(request.user.pk, post.author.username, *changes)
+    return etag, latest_timestamp(*changes)
+
+
 def post_detail(request, post_id):
     """Отображение полного описания выбранной публикации"""
-    post = get_object_or_404(Post, id=post_id)
+    posts = Post.objects.select_related('category', 'location', 'author')
+    post = get_object_or_404(posts, id=post_id)
     if request.user != post.author:
         post = get_object_or_404(
-            Post,
+            posts,
             id=post_id,
             is_published=True,
             category__is_published=True,
             pub_date__lte=datetime.now())
+        post_views.incr(post.id)
+        post_readers.add_reader(post, get_reader_key(request))
+    etag, last_modified = get_post_validators(request, post)
+    response = get_not_modified(request, etag, last_modified)
+    if response is not None:
+        return set_validators(response, etag, last_modified)
     form = CommentForm(request.POST or None)
-    comments = Comment.objects.select_related(
-        'author').filter(post=post)
+    page_obj, comments = get_comment_threads(request, post)
+    reply_to = request.GET.get('reply_to')
+    if reply_to and reply_to.isdigit():
+        reply_to = Comment.objects.filter(post=post, id=reply_to).first()
+    else:
+        reply_to = None
     context = {'post': post,
                'form': form,
-               'comments': comments}
-    return render(request, 'blog/post_detail.html', context)
+               'page_obj': page_obj,
+               'comments': comments,
+               'reply_to': reply_to,
+               'unique_readers': unique_readers(ReaderSketch.POST,
+                                                [post.id])}
+    return set_validators(render(request, 'blog/post_detail.html', context),
+                          etag, last_modified)
+
+
+def get_comment_threads(request, post):
+    """Страница веток комментариев: корневые комментарии разбиваются
+       на страницы, ветки целиком выбираются одним запросом по path"""
+    page_obj = get_paginator(
+        request,
+        Comment.objects.filter(post=post, parent=None).order_by('path'),
+        NUMBER_OF_COMMENT_THREADS)
+    roots = list(page_obj)
+    if not roots:
+        return page_obj, []
+    comments = Comment.objects.select_related('author').filter(
+        post=post,
+        path__gte=roots[0].path,
+        path__lt=Comment.subtree_end(roots[-1].path),
+    ).order_by('path')
+    return page_obj, comments
 
 
 @login_required
@@ -86,6 +305,8 @@ def create_post(request):
         post = form.save(commit=False)
         post.author = request.user
         post.save()
+        set_post_tags(post, form.cleaned_data['tag_names'])
+        schedule_fanout(post)
         return redirect('blog:profile', request.user)
     context = {'form': form}
     return render(request, 'blog/create.html', context)
@@ -100,6 +321,11 @@ def edit_post(request, post_id):
     form = PostForm(request.POST or None, instance=post)
     if form.is_valid():
         form.save()
+        if 'tag_names' in form.changed_data:
+            set_post_tags(post, form.cleaned_data['tag_names'])
+        if 'pub_date' in form.changed_data:
+            TimelineEntry.objects.filter(post=post).update(
+                pub_date=post.pub_date)
         return redirect('blog:post_detail', post_id)
     context = {'form': form}
     return render(request, 'blog/create.html', context)
@@ -113,7 +339,7 @@ def delete_post(request, post_id):
         return redirect('blog:post_detail', post_id)
     form = PostForm(request.POST or None, instance=post)
     if request.method == 'POST':
-        post.delete()
+        schedule_deletion(post)
         return redirect('blog:index')
     context = {'form': form}
     return render(request, 'blog/create.html', context)
@@ -128,10 +354,23 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
+        parent_id = request.POST.get('parent')
+        if parent_id and parent_id.isdigit():
+            comment.parent = get_reply_parent(post, parent_id)
         comment.save()
+        record_activity({post.id: 1}, 'comments')
     return redirect('blog:post_detail', post_id)
 
 
+def get_reply_parent(post, parent_id):
+    """Комментарий, к которому прикрепляется ответ; ответы глубже
+       COMMENT_MAX_DEPTH прикрепляются к ближайшему допустимому предку"""
+    parent = get_object_or_404(Comment, id=parent_id, post=post)
+    while parent.depth >= settings.COMMENT_MAX_DEPTH:
+        parent = parent.parent
+    return parent
+
+
 @login_required
 def edit_comment(request, post_id, comment_id):
     """Редактирование комментария к публикации"""
@@ -162,31 +401,131 @@ def delete_comment(request, post_id, comment_id):
 
 def profile(request, username):
     """Отображение страницы пользователя"""
-    profile = get_object_or_404(
-        User,
-        username=username)
-    posts = get_posts(author=profile)
+    if request.user.is_authenticated and request.user.username == username:
+        profile = request.user
+    else:
+        profile = get_object_or_404(
+            User,
+            username=username)
+    filters = {'author': profile}
     if request.user != profile:
-        posts = get_posts(
-            is_published=True,
-            category__is_published=True,
-            pub_date__lte=datetime.now(),
-            author=profile)
+        filters.update(is_published=True,
+                       category__is_published=True,
+                       pub_date__lte=datetime.now())
+    is_following = (
+        request.user.is_authenticated
+        and request.user != profile
+        and profile.followers.filter(user=request.user).exists()
+    )
+    etag, last_modified = get_profile_validators(
+        request, profile, filters, is_following)
+    response = get_not_modified(request, etag, last_modified)
+    if response is not None:
+        return set_validators(response, etag, last_modified)
+    posts = get_posts(**filters)
     page_obj = get_paginator(request, posts)
     context = {'profile': profile,
-               'page_obj': page_obj}
-    return render(request, 'blog/profile.html', context)
+               'page_obj': page_obj,
+               'is_following': is_following,
+               'unique_readers': unique_readers(ReaderSketch.AUTHOR,
+                                                [profile.id])}
+    return set_validators(render(request, 'blog/profile.html', context),
+                          etag, last_modified)
+
+
+def get_profile_validators(request, profile, filters, is_following):
+    """ETag и Last-Modified страницы пользователя по времени изменения
+       его публикаций (в том числе комментариев к ним), их категорий
+       и мест"""
+    posts = Post.objects.filter(**filters).aggregate(
+        count=Count('pk'),
+        updated=Max('updated_at'),
+        category_updated=Max('category__updated_at'),
+        location_updated=Max('location__updated_at'))
+    changes = (posts['updated'], posts['category_updated'],
+               posts['location_updated'])
+    etag = make_etag(
+        request.user.pk, is_following, profile.username,
+        profile.get_full_name(), profile.is_staff, posts['count'], *changes)
+    return etag, latest_timestamp(*changes)
+
+
+@login_required
+def feed(request):
+    """Лента публикаций авторов, на которых подписан пользователь"""
+    posts, next_cursor = get_home_page(
+        request.user, parse_cursor(request.GET.get('before')),
+        NUMBER_OF_PAGINATOR_PAGES)
+    context = {'posts': posts,
+               'next_cursor': next_cursor}
+    return render(request, 'blog/feed.html', context)
+
+
+@login_required
+def follow_author(request, username):
+    """Подписка на автора"""
+    author = get_object_or_404(User, username=username)
+    if request.method == 'POST':
+        follow(request.user, author)
+    return redirect('blog:profile', username)
+
+
+@login_required
+def unfollow_author(request, username):
+    """Отписка от автора"""
+    author = get_object_or_404(User, username=username)
+    if request.method == 'POST':
+        unfollow(request.user, author)
+    return redirect('blog:profile', username)
 
 
 @login_required
 def edit_profile(request):
     """Редактирование страницы пользователя"""
-    profile = get_object_or_404(
-        User,
-        username=request.user)
-    form = UserForm(request.POST or None, instance=profile)
+    # Привязанная форма меняет свой экземпляр и при ошибках, поэтому
+    # для POST он загружается отдельно от request.user из кэша.
+    user = request.user
+    if request.method == 'POST':
+        user = User.objects.get(pk=user.pk)
+    form = UserForm(request.POST or None, instance=user)
     if form.is_valid():
         form.save()
-        return redirect('blog:profile', request.user)
+        return redirect('blog:profile', user.username)
     context = {'form': form}
     return render(request, 'blog/user.html', context)
+
+
+def prefix_filter(field, prefix):
+    """Поиск по началу строки диапазоном по индексу поля;
+       учитывается и вариант с заглавной первой буквой"""
+    query = Q()
+    for variant in {prefix, prefix[:1].upper() + prefix[1:]}:
+        query |= Q(**{f'{field}__gte': variant,
+                      f'{field}__lt': variant + '\U0010ffff'})
+    return query
+
+
+def autocomplete(request, model, field):
+    """Подсказки для выбора объекта по началу названия"""
+    prefix = request.GET.get('q', '').strip()
+    results = []
+    if prefix:
+        results = model.objects.filter(
+            prefix_filter(field, prefix)
+        ).order_by(field).values_list(
+            'pk', field)[:NUMBER_OF_AUTOCOMPLETE_RESULTS]
+    return JsonResponse({
+        'results': [{'id': pk, 'text': text} for pk, text in results]
+    })
+
+
+@login_required
+def autocomplete_category(request):
+    """Подсказки категорий для формы публикации"""
+    return autocomplete(request, Category, 'title')
+
+
+@login_required
+def autocomplete_location(request):
+    """Подсказки местоположений для формы публикации"""
+    return autocomplete(request, Location, 'name')
@@ -0,0 +1,59 @@
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """Select, в котором выводится только выбранный вариант.
+
+    Остальные варианты подгружаются по мере ввода с url_name, поэтому
+    страница не зависит от размера таблицы.
+    """
+
+    class Media:
+        js = ('js/autocomplete.js',)
+
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = reverse(
+            self.url_name)
+        return context
+
+    def get_selected_choices(self, value):
+        field = self.choices.field
+        choices = [('', field.empty_label or '')]
+        pks = self.clean_pks(field, value)
+        if pks:
+            choices += [
+                (obj.pk, field.label_from_instance(obj))
+                for obj in field.queryset.filter(pk__in=pks)
+            ]
+        return choices
+
+    @staticmethod
+    def clean_pks(field, value):
+        """Допустимые значения ключа; остальные отбрасываются, ошибку
+           неверного выбора выводит поле формы"""
+        pk_field = field.queryset.model._meta.pk
+        pks = []
+        for pk in value:
+            if not pk:
+                continue
+            try:
+                pks.append(pk_field.to_python(pk))
+            except ValidationError:
+                continue
+        return pks
+
+    def optgroups(self, name, value, attrs=None):
+        return [
+            (None, [self.create_option(
+                name, option_value, label, str(option_value) in value,
+                index, attrs=attrs)], index)
+            for index, (option_value, label) in enumerate(
+                self.get_selected_choices(value))
+        ]
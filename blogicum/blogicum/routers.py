@@ -0,0 +1,20 @@
+class SessionRouter:
+    """Хранение сессий в отдельной базе данных"""
+
+    app_label = 'sessions'
+    database = 'sessions'
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == self.app_label:
+            return self.database
+        return None
+
+    def db_for_write(self, model, **hints):
+        return self.db_for_read(model, **hints)
+
+    def allow_migrate(self, db, app_label, **hints):
+        if app_label == self.app_label:
+            return db == self.database
+        if db == self.database:
+            return False
+        return None
@@ -1,3 +1,4 @@
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -18,12 +19,95 @@ ALLOWED_HOSTS = [
     '127.0.0.1',
 ]
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = 'notifications.backends.QueuedEmailBackend'
+
+# Backend used by the send_queued_mail worker to deliver queued messages;
+# switch to 'django.core.mail.backends.smtp.EmailBackend' in production.
+EMAIL_QUEUE_DELIVERY_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+
+EMAIL_QUEUE_BATCH_SIZE = 100
+
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
+# Comments to a post author are collected for this long before
+# send_comment_digests mails them a single digest.
+COMMENT_DIGEST_WINDOW = timedelta(hours=1)
+
+# Replies deeper than this are attached to the nearest allowed ancestor.
+# Top-level comments have depth 0; Comment.path fits up to depth 12.
+COMMENT_MAX_DEPTH = 4
+
+# Post views are counted in memory of each worker and written in one
+# transaction at most this often (seconds) or once this many posts have
+# pending views, whichever comes first.
+POST_VIEWS_FLUSH_INTERVAL = 10
+POST_VIEWS_MAX_PENDING = 500
+
+# update_trending ranks posts by views and comments counted in windows
+# of TRENDING_WINDOW; activity loses half its weight every
+# TRENDING_HALF_LIFE and is forgotten after TRENDING_HORIZON.
+TRENDING_WINDOW = timedelta(minutes=5)
+TRENDING_HALF_LIFE = timedelta(hours=6)
+TRENDING_HORIZON = timedelta(days=2)
+TRENDING_COMMENT_WEIGHT = 5
+TRENDING_SIZE = 50
+
+# New posts are copied into followers' timelines by run_fanout_jobs,
+# keeping at most TIMELINE_MAX_ENTRIES per reader. Posts of authors with
+# at least TIMELINE_CELEBRITY_FOLLOWERS followers are merged in on read
+# instead. With TIMELINE_FANOUT = False /feed/ is built on read only.
+TIMELINE_FANOUT = True
+TIMELINE_MAX_ENTRIES = 500
+TIMELINE_CELEBRITY_FOLLOWERS = 10000
+TIMELINE_CELEBRITY_CACHE_TIMEOUT = 300
+
+# /nearby/ searches published locations within the given radius (km) and
+# shows posts from at most NEARBY_MAX_LOCATIONS nearest of them.
+NEARBY_DEFAULT_RADIUS = 10
+NEARBY_MAX_RADIUS = 500
+NEARBY_MAX_LOCATIONS = 500
+
+# RSS/Atom feeds list the latest FEED_SIZE posts. Rendered feeds are cached
+# until content changes, for at most FEED_CACHE_TIMEOUT seconds.
+FEED_SIZE = 20
+FEED_CACHE_TIMEOUT = 600
+
+# /sitemap.xml lists sitemap files of SITEMAP_SHARD_SIZE id ranges each.
+# Files are cached in SITEMAP_CACHE_DIR and rebuilt when their objects
+# change.
+SITEMAP_SHARD_SIZE = 50000
+SITEMAP_CACHE_DIR = BASE_DIR / 'sitemap_cache'
+
+# Absolute URL of the site for links in emails.
+SITE_URL = 'http://127.0.0.1:8000'
+
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+# Offload of media files to the web server: None, 'X-Accel-Redirect' (nginx,
+# internal location at MEDIA_ACCEL_REDIRECT_URL) or 'X-Sendfile' (Apache).
+MEDIA_SENDFILE_HEADER = None
+
+MEDIA_ACCEL_REDIRECT_URL = '/protected-media/'
+
+# Post images resized on demand by /media/resize/<w>x<h>/<path>.
+MEDIA_RESIZE_SIZES = [
+    (320, 240),
+    (640, 480),
+    (1280, 960),
+]
+
+MEDIA_RESIZE_CACHE_DIR = BASE_DIR / 'media_cache'
+
+MEDIA_RESIZE_CACHE_MAX_SIZE = 512 * 1024 * 1024
+
+# The resize cache directory is scanned for eviction when the estimated size
+# exceeds the limit, or at most once per this many seconds.
+MEDIA_RESIZE_CACHE_CHECK_INTERVAL = 300
+
 LOGIN_REDIRECT_URL = 'blog:index'
 
 LOGIN_URL = 'login'
@@ -45,6 +129,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'notifications.apps.NotificationsConfig',
     'django_bootstrap5',
 ]
 
@@ -92,6 +177,34 @@ DATABASES = {
 }
 
 
+# Sessions
+# https://docs.djangoproject.com/en/3.2/topics/http/sessions/
+
+# Session storage: 'cached_db', 'signed_cookies', 'database' or
+# 'separate_db' (database backend on its own SQLite file).
+SESSION_STORAGE = 'cached_db'
+
+SESSION_ENGINE = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'database': 'django.contrib.sessions.backends.db',
+    'separate_db': 'django.contrib.sessions.backends.db',
+}[SESSION_STORAGE]
+
+if SESSION_STORAGE == 'separate_db':
+    DATABASES['sessions'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'sessions.sqlite3',
+    }
+    DATABASE_ROUTERS = ['blogicum.routers.SessionRouter']
+
+
+AUTHENTICATION_BACKENDS = ['blog.backends.CachedModelBackend']
+
+# Seconds a session user is served from cache before re-reading the row.
+USER_CACHE_TIMEOUT = 60
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -130,6 +243,10 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STATICFILES_STORAGE = 'blogicum.staticfiles.CompressedManifestStaticFilesStorage'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
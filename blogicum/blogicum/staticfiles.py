@@ -0,0 +1,96 @@
+import gzip
+import mimetypes
+import os
+import re
+
+import brotli
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import Http404
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from blog.media import get_file_path, serve_file
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.txt', '.json', '.xml', '.map',
+)
+ENCODINGS = (
+    ('br', '.br'),
+    ('gzip', '.gz'),
+)
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, max-age=60'
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хранилище статики с хэшами в именах и сжатыми копиями файлов"""
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            # collectstatic ещё не запускался: разработка и тесты.
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        """Создание .gz и .br копий файла, если они меньше оригинала"""
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            content = file.read()
+        compressed = {
+            '.gz': gzip.compress(content, compresslevel=9, mtime=0),
+            '.br': brotli.compress(content),
+        }
+        for suffix, data in compressed.items():
+            if len(data) < len(content):
+                with open(path + suffix, 'wb') as file:
+                    file.write(data)
+
+
+def get_encoded_path(request, path):
+    """Выбор сжатой копии файла по заголовку Accept-Encoding"""
+    accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    accepted = {
+        encoding.split(';')[0].strip()
+        for encoding in accept_encoding.split(',')
+    }
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted:
+            try:
+                full_path, file_stat = get_file_path(
+                    settings.STATIC_ROOT, path + suffix)
+            except Http404:
+                continue
+            return encoding, full_path, file_stat
+    full_path, file_stat = get_file_path(settings.STATIC_ROOT, path)
+    return None, full_path, file_stat
+
+
+@require_safe
+def serve(request, path):
+    """Отдача собранной статики со сжатием и долгим кэшированием"""
+    encoding, full_path, file_stat = get_encoded_path(request, path)
+    content_type, _ = mimetypes.guess_type(path)
+    response = serve_file(
+        request, full_path, file_stat,
+        content_type=content_type or 'application/octet-stream')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if os.path.splitext(path)[1] in COMPRESSIBLE_EXTENSIONS:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if HASHED_NAME_RE.search(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+    return response
@@ -1,10 +1,12 @@
 from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
 from django.conf import settings
-from django.conf.urls.static import static
 from django.views.generic.edit import CreateView
 from django.urls import include, path, reverse_lazy
 
+from blog import media
+from . import staticfiles
+
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.internal_server_error'
@@ -23,4 +25,11 @@ urlpatterns = [
         ),
         name='registration',
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(settings.STATIC_URL.lstrip('/') + '<path:path>',
+         staticfiles.serve, name='static'),
+    path(settings.MEDIA_URL.lstrip('/')
+         + 'resize/<int:width>x<int:height>/<path:path>',
+         media.resize, name='media_resize'),
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>',
+         media.serve, name='media'),
+]
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import OutgoingEmail
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'created_at', 'attempts',
+                    'next_attempt_at')
+    exclude = ('message',)
+    readonly_fields = ('subject', 'recipients', 'attempts', 'last_error')
@@ -0,0 +1,32 @@
+import pickle
+
+from django.core.mail.backends.base import BaseEmailBackend
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Складывает письма в таблицу исходящих вместо отправки в запросе.
+
+    Отправкой занимается команда send_queued_mail.
+    """
+
+    def send_messages(self, email_messages):
+        now = timezone.now()
+        outgoing = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            connection, message.connection = message.connection, None
+            try:
+                data = pickle.dumps(message)
+            finally:
+                message.connection = connection
+            outgoing.append(OutgoingEmail(
+                message=data,
+                subject=message.subject[:998],
+                recipients='\n'.join(message.recipients()),
+                next_attempt_at=now))
+        OutgoingEmail.objects.bulk_create(outgoing)
+        return len(outgoing)
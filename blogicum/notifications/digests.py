@@ -0,0 +1,80 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import CommentEvent
+
+DIGEST_SUBJECT = 'Новые комментарии к вашим публикациям'
+RECIPIENTS_PER_BATCH = 500
+
+
+def build_digests(events):
+    """Письма со сводкой по событиям пачки авторов"""
+    posts = defaultdict(list)
+    users = {}
+    for event in events:
+        users[event['recipient']] = (
+            event['recipient__username'], event['recipient__email'])
+        posts[event['recipient']].append({
+            'title': event['post__title'],
+            'count': event['count'],
+            'url': settings.SITE_URL + reverse(
+                'blog:post_detail', args=(event['post'],)),
+        })
+    return [
+        EmailMessage(
+            DIGEST_SUBJECT,
+            render_to_string('notifications/comment_digest.txt', {
+                'username': username,
+                'posts': posts[recipient],
+            }),
+            to=[email])
+        for recipient, (username, email) in users.items() if email
+    ]
+
+
+def forget_sent(events):
+    """Вычитание отправленных комментариев из счётчиков событий.
+
+    Событие удаляется, только если после чтения к публикации не пришло
+    новых комментариев; иначе остаток дождётся следующей сводки.
+    """
+    by_count = defaultdict(list)
+    for event in events:
+        by_count[event['count']].append(event['pk'])
+    for count, pks in by_count.items():
+        CommentEvent.objects.filter(pk__in=pks, count=count).delete()
+        CommentEvent.objects.filter(pk__in=pks).update(
+            count=F('count') - count, first_at=timezone.now())
+
+
+def send_comment_digests():
+    """Одно письмо на автора со сводкой новых комментариев.
+
+    Автор попадает в рассылку, когда его самое старое событие старше
+    COMMENT_DIGEST_WINDOW. События хранят счётчик на пару (автор,
+    публикация), поэтому объём чтения растёт с числом авторов и их
+    публикаций, а не комментариев. Возвращает число отправленных писем.
+    """
+    cutoff = timezone.now() - settings.COMMENT_DIGEST_WINDOW
+    recipients = list(CommentEvent.objects.filter(
+        first_at__lte=cutoff
+    ).order_by().values_list('recipient', flat=True).distinct())
+
+    sent = 0
+    connection = get_connection()
+    for start in range(0, len(recipients), RECIPIENTS_PER_BATCH):
+        events = list(CommentEvent.objects.filter(
+            recipient__in=recipients[start:start + RECIPIENTS_PER_BATCH]
+        ).values(
+            'pk', 'recipient', 'recipient__username', 'recipient__email',
+            'post', 'post__title', 'count'
+        ).order_by('recipient', '-count'))
+        sent += connection.send_messages(build_digests(events)) or 0
+        forget_sent(events)
+    return sent
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from notifications.digests import send_comment_digests
+
+
+class Command(BaseCommand):
+    help = 'Рассылает авторам сводки новых комментариев к их публикациям'
+
+    def handle(self, *args, **options):
+        sent = send_comment_digests()
+        self.stdout.write(f'Отправлено сводок: {sent}')
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, проверяя очередь каждые --interval с')
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_queued_mail(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'Отправлено: {sent}, ошибок: {failed}')
+            if not options['loop']:
+                break
+            if not sent:
+                time.sleep(options['interval'])
@@ -0,0 +1,57 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:05
+
+from django.db import migrations, models
+import django.utils.timezone
+from django.db.models import Count, Min
+
+
+def merge_events(apps, schema_editor):
+    """Несколько строк одной пары (получатель, публикация) сводятся
+       в одну со счётчиком"""
+    CommentEvent = apps.get_model('notifications', 'CommentEvent')
+    groups = CommentEvent.objects.values('recipient', 'post').annotate(
+        total=Count('pk'), first=Min('created_at'), first_pk=Min('pk'))
+    for group in groups:
+        CommentEvent.objects.filter(pk=group['first_pk']).update(
+            count=group['total'], first_at=group['first'])
+        CommentEvent.objects.filter(
+            recipient=group['recipient'], post=group['post']
+        ).exclude(pk=group['first_pk']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_comment_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='commentevent',
+            name='count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='commentevent',
+            name='first_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Первый комментарий'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(merge_events, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='commentevent',
+            name='comment_event_recipient_idx',
+        ),
+        migrations.RemoveField(
+            model_name='commentevent',
+            name='created_at',
+        ),
+        migrations.AddIndex(
+            model_name='commentevent',
+            index=models.Index(fields=['first_at'], name='comment_event_first_at_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='commentevent',
+            constraint=models.UniqueConstraint(fields=('recipient', 'post'), name='comment_event_unique'),
+        ),
+    ]
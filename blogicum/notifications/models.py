@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from blog.models import Post
+
+User = get_user_model()
+
+
+class OutgoingEmail(models.Model):
+    message = models.BinaryField('Письмо')
+    subject = models.CharField('Тема', max_length=998, blank=True)
+    recipients = models.TextField('Получатели')
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        null=True,
+        help_text='Пусто, если попытки отправки исчерпаны.'
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = (
+            models.Index(fields=('next_attempt_at',),
+                         name='outbox_next_attempt_idx'),
+        )
+
+    def __str__(self) -> str:
+        return self.subject
+
+
+class CommentEvent(models.Model):
+    """Новые комментарии к публикации, о которых автор ещё не получил
+       сводку: одна строка на пару (получатель, публикация)"""
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Получатель',
+        related_name='comment_events'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        verbose_name='Публикация',
+        related_name='+'
+    )
+    count = models.PositiveIntegerField('Комментариев', default=0)
+    first_at = models.DateTimeField('Первый комментарий', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'событие комментария'
+        verbose_name_plural = 'События комментариев'
+        constraints = (
+            models.UniqueConstraint(fields=('recipient', 'post'),
+                                    name='comment_event_unique'),
+        )
+        indexes = (
+            models.Index(fields=('first_at',),
+                         name='comment_event_first_at_idx'),
+        )
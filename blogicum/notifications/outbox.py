@@ -0,0 +1,76 @@
+import pickle
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+RETRY_DELAY = timedelta(minutes=1)
+# Пока пачка отправляется, её письма не выбираются повторно.
+LEASE_TIME = timedelta(minutes=10)
+
+
+def schedule_retry(email, error, now):
+    """Откладывание письма после неудачной попытки отправки"""
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    if email.attempts < settings.EMAIL_QUEUE_MAX_ATTEMPTS:
+        email.next_attempt_at = now + RETRY_DELAY * 2 ** (email.attempts - 1)
+    else:
+        email.next_attempt_at = None
+
+
+def send_queued_mail(batch_size=None):
+    """Отправка пачки писем из очереди через одно соединение.
+
+    Неудачные письма откладываются с экспоненциальной задержкой, после
+    EMAIL_QUEUE_MAX_ATTEMPTS попыток остаются в таблице с ошибкой.
+    Возвращает пару (отправлено, ошибок).
+    """
+    now = timezone.now()
+    batch_size = batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+    due = OutgoingEmail.objects.filter(next_attempt_at__lte=now)
+    pks = list(due.order_by('next_attempt_at').values_list(
+        'pk', flat=True)[:batch_size])
+    if not pks:
+        return 0, 0
+    # Условный UPDATE захватывает только письма, которые ещё не взял
+    # другой обработчик; отправляются только захваченные.
+    leased_until = now + LEASE_TIME
+    with transaction.atomic():
+        due.filter(pk__in=pks).update(next_attempt_at=leased_until)
+        batch = list(OutgoingEmail.objects.filter(
+            pk__in=pks, next_attempt_at=leased_until))
+    if not batch:
+        return 0, 0
+
+    sent = []
+    failed = []
+    connection = get_connection(settings.EMAIL_QUEUE_DELIVERY_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in batch:
+            schedule_retry(email, error, now)
+        failed = batch
+    else:
+        try:
+            for email in batch:
+                try:
+                    message = pickle.loads(email.message)
+                    message.connection = connection
+                    connection.send_messages([message])
+                except Exception as error:
+                    schedule_retry(email, error, now)
+                    failed.append(email)
+                else:
+                    sent.append(email.pk)
+        finally:
+            connection.close()
+    OutgoingEmail.objects.filter(pk__in=sent).delete()
+    OutgoingEmail.objects.bulk_update(
+        failed, ('attempts', 'last_error', 'next_attempt_at'))
+    return len(sent), len(failed)
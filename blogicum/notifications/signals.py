@@ -0,0 +1,21 @@
+from django.db.models import F
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from blog.models import Comment
+
+from .models import CommentEvent
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_event(sender, instance, created, **kwargs):
+    if not created or instance.author_id == instance.post.author_id:
+        return
+    events = CommentEvent.objects.filter(
+        recipient_id=instance.post.author_id, post_id=instance.post_id)
+    if not events.update(count=F('count') + 1):
+        CommentEvent.objects.bulk_create(
+            [CommentEvent(recipient_id=instance.post.author_id,
+                          post_id=instance.post_id)],
+            ignore_conflicts=True)
+        events.update(count=F('count') + 1)
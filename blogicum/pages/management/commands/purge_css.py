@@ -0,0 +1,147 @@
+import re
+from pathlib import Path
+
+import django_bootstrap5
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+SOURCE_CSS = 'css/bootstrap.min.css'
+PURGED_CSS = 'css/bootstrap.purged.css'
+CRITICAL_TEMPLATE = 'includes/critical_css.html'
+CRITICAL_TEMPLATES = (
+    'base.html',
+    'includes/header.html',
+    'includes/footer.html',
+)
+# Классы, которые django_bootstrap5 добавляет к полям форм из Python-кода.
+SAFELIST = {
+    'alert', 'alert-danger', 'alert-dismissible', 'btn', 'btn-close',
+    'btn-primary', 'col-form-label', 'form-check', 'form-check-inline',
+    'form-check-input', 'form-check-label', 'form-control', 'form-label',
+    'form-range', 'form-select', 'form-switch', 'form-text', 'input-group',
+    'input-group-text', 'invalid-feedback', 'is-invalid', 'is-valid', 'mb-3',
+    'text-muted', 'valid-feedback', 'visually-hidden',
+}
+CLASS_ATTR_RE = re.compile(r'class\s*=\s*"([^"]*)"|class\s*=\s*\'([^\']*)\'')
+TEMPLATE_VAR_RE = re.compile(r'{{.*?}}|{%|%}')
+SELECTOR_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+BANNER_RE = re.compile(r'/\*!.*?\*/', re.DOTALL)
+
+
+def template_classes(paths):
+    """Классы из атрибутов class шаблонов"""
+    classes = set()
+    for path in paths:
+        content = Path(path).read_text(encoding='utf-8')
+        for match in CLASS_ATTR_RE.finditer(content):
+            value = TEMPLATE_VAR_RE.sub(' ', match.group(1) or match.group(2))
+            classes.update(value.split())
+    return classes
+
+
+def split_rules(css):
+    """Разбиение CSS на правила верхнего уровня: (prelude, body);
+       у at-правил без блока body равен None"""
+    rules = []
+    depth = 0
+    start = 0
+    prelude_end = 0
+    position = 0
+    while position < len(css):
+        char = css[position]
+        if char in '"\'':
+            position = css.index(char, position + 1)
+        elif char == '{':
+            if depth == 0:
+                prelude_end = position
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((css[start:prelude_end].strip(),
+                              css[prelude_end + 1:position]))
+                start = position + 1
+        elif char == ';' and depth == 0:
+            rules.append((css[start:position].strip(), None))
+            start = position + 1
+        position += 1
+    return rules
+
+
+def split_selectors(prelude):
+    """Разбиение списка селекторов по запятым вне скобок"""
+    selectors = []
+    depth = 0
+    start = 0
+    for position, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:position])
+            start = position + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def purge(rules, used):
+    """Правила, все классы селекторов которых используются в шаблонах"""
+    result = []
+    for prelude, body in rules:
+        if body is None:
+            result.append(prelude + ';')
+        elif prelude.startswith(('@media', '@supports')):
+            inner = purge(split_rules(body), used)
+            if inner:
+                result.append(prelude + '{' + ''.join(inner) + '}')
+        elif prelude.startswith('@'):
+            result.append(prelude + '{' + body + '}')
+        else:
+            selectors = [
+                selector for selector in split_selectors(prelude)
+                if set(SELECTOR_CLASS_RE.findall(selector)) <= used
+            ]
+            if selectors:
+                result.append(','.join(selectors) + '{' + body + '}')
+    return result
+
+
+class Command(BaseCommand):
+    help = ('Собирает из bootstrap.min.css только используемые в шаблонах '
+            'правила и встраивает критический CSS в base.html')
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        templates_dir = Path(settings.TEMPLATES_DIR)
+        bootstrap_dir = (Path(django_bootstrap5.__file__).parent
+                         / 'templates')
+
+        source = (static_dir / SOURCE_CSS).read_text(encoding='utf-8')
+        banner = BANNER_RE.search(source)
+        rules = split_rules(COMMENT_RE.sub('', source))
+
+        used = SAFELIST | template_classes(
+            list(templates_dir.rglob('*.html'))
+            + list(bootstrap_dir.rglob('*.html')))
+        purged = purge(rules, used)
+        if banner:
+            # @charset должен оставаться первым в файле.
+            purged.insert(1 if purged[0].startswith('@charset') else 0,
+                          banner.group(0) + '\n')
+        purged = ''.join(purged)
+        (static_dir / PURGED_CSS).write_text(purged, encoding='utf-8')
+
+        critical_used = template_classes(
+            templates_dir / name for name in CRITICAL_TEMPLATES)
+        critical = ''.join(
+            rule for rule in purge(rules, critical_used)
+            if not rule.startswith('@charset'))
+        (templates_dir / CRITICAL_TEMPLATE).write_text(
+            f'{{% verbatim %}}<style>{critical}</style>{{% endverbatim %}}\n',
+            encoding='utf-8')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{PURGED_CSS}: {len(source)} -> {len(purged)} байт, '
+            f'критический CSS: {len(critical)} байт'))
@@ -0,0 +1,30 @@
+document.addEventListener('DOMContentLoaded', function () {
+  document.querySelectorAll('select[data-autocomplete-url]').forEach(function (select) {
+    var search = document.createElement('input');
+    var timer = null;
+    search.type = 'search';
+    search.className = 'form-control mb-2';
+    search.placeholder = 'Начните вводить название';
+    select.parentNode.insertBefore(search, select);
+
+    search.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        var url = select.dataset.autocompleteUrl + '?q=' + encodeURIComponent(search.value);
+        fetch(url, {credentials: 'same-origin'})
+          .then(function (response) { return response.json(); })
+          .then(function (data) {
+            var empty = select.options[0];
+            select.innerHTML = '';
+            select.appendChild(empty);
+            data.results.forEach(function (item) {
+              select.appendChild(new Option(item.text, item.id));
+            });
+            if (data.results.length) {
+              select.selectedIndex = 1;
+            }
+          });
+      }, 250);
+    });
+  });
+});
@@ -0,0 +1,98 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+from blog.paginators import EstimatedCountPaginator
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url', [
+        '/admin/blog/post/',
+        '/admin/blog/post/add/',
+        '/admin/blog/comment/',
+        '/admin/blog/category/',
+        '/admin/blog/location/',
+    ]
+)
+def test_admin_pages(admin_client, url):
+    response = admin_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db
+def test_post_changelist_queries_do_not_grow(
+        admin_client, mixer, django_assert_max_num_queries):
+    mixer.cycle(5).blend(Post)
+    admin_client.get('/admin/blog/post/')
+    with django_assert_max_num_queries(8):
+        admin_client.get('/admin/blog/post/')
+    mixer.cycle(20).blend(Post)
+    with django_assert_max_num_queries(8):
+        response = admin_client.get('/admin/blog/post/')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что число запросов на странице списка публикаций в'
+        ' админке не зависит от числа публикаций.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_changelist_does_not_list_categories(admin_client, mixer):
+    mixer.blend('blog.Category', title='Категория без публикаций')
+    response = admin_client.get('/admin/blog/post/')
+    assert 'Категория без публикаций' not in response.content.decode(), (
+        'Убедитесь, что на странице списка публикаций в админке не'
+        ' выводится список всех категорий.'
+    )
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator(mixer):
+    mixer.cycle(7).blend(Post)
+    paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+    paginator.count_limit = 5
+    assert paginator.count >= 7
+    paginator = EstimatedCountPaginator(
+        Post.objects.filter(pk__gt=0).order_by('pk'), 2)
+    paginator.count_limit = 5
+    assert paginator.count == 5
+    paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+    assert paginator.count == 7
+
+
+@pytest.mark.django_db
+def test_unpublish_action_sends_single_event(admin_client, mixer):
+    from blog.signals import content_changed
+
+    posts = mixer.cycle(5).blend(Post, is_published=True)
+    events = []
+
+    def listener(sender, count, **kwargs):
+        events.append(count)
+
+    content_changed.connect(listener)
+    try:
+        admin_client.post('/admin/blog/post/', {
+            'action': 'unpublish',
+            '_selected_action': [post.pk for post in posts[:3]],
+        })
+    finally:
+        content_changed.disconnect(listener)
+    assert Post.objects.filter(is_published=False).count() == 3, (
+        'Убедитесь, что действие админки снимает выбранные публикации.'
+    )
+    assert events == [3], (
+        'Убедитесь, что массовое изменение отправляет одно событие.'
+    )
+
+
+@pytest.mark.django_db
+def test_set_published_command(mixer):
+    mixer.cycle(5).blend(Post, is_published=False)
+    call_command('set_published', 'post', chunk_size=2)
+    assert not Post.objects.filter(is_published=False).exists()
+    call_command('set_published', 'post', '--unpublish',
+                 '--filter', f'pk__lte={Post.objects.order_by("pk")[1].pk}')
+    assert Post.objects.filter(is_published=False).count() == 2
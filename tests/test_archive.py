@@ -0,0 +1,148 @@
+from datetime import date, datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.archive import rebuild_archive
+from blog.models import MonthlyPostCount, Post, VisibilityJob
+from blog.services import (
+    run_visibility_jobs, schedule_deletion, set_published
+)
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+@pytest.fixture
+def archive_posts(mixer, user):
+    category = mixer.blend('blog.Category', is_published=True)
+    dates = [
+        aware(2023, 12, 31, 23), aware(2024, 1, 5), aware(2024, 1, 20),
+        aware(2024, 3, 1),
+    ]
+    return [
+        mixer.blend(Post, author=user, category=category, is_published=True,
+                    pub_date=pub_date)
+        for pub_date in dates
+    ]
+
+
+def get_counts():
+    return dict(MonthlyPostCount.objects.values_list('month', 'post_count'))
+
+
+@pytest.mark.django_db
+def test_month_counts_updated_incrementally(archive_posts):
+    assert get_counts() == {
+        date(2023, 12, 1): 1, date(2024, 1, 1): 2, date(2024, 3, 1): 1
+    }, 'Убедитесь, что счётчики месяцев обновляются при создании публикаций.'
+    post = archive_posts[1]
+    post.pub_date = aware(2024, 3, 10)
+    post.save()
+    assert get_counts()[date(2024, 1, 1)] == 1
+    assert get_counts()[date(2024, 3, 1)] == 2, (
+        'Убедитесь, что при смене даты пересчитываются оба месяца.'
+    )
+    set_published(Post.objects.filter(pk=archive_posts[0].pk), False)
+    assert date(2023, 12, 1) not in get_counts()
+    schedule_deletion(archive_posts[3])
+    assert get_counts()[date(2024, 3, 1)] == 1
+    category = archive_posts[2].category
+    category.is_published = False
+    category.save()
+    run_visibility_jobs()
+    assert get_counts() == {}, (
+        'Убедитесь, что снятие категории с публикации обновляет архив.'
+    )
+    category.is_published = True
+    category.save()
+    run_visibility_jobs()
+    expected = get_counts()
+    rebuild_archive()
+    assert get_counts() == expected
+
+
+@pytest.mark.django_db
+def test_archive_views(client, archive_posts):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/archive/2024/1/')
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.context['page_obj']) == [
+        archive_posts[2], archive_posts[1]
+    ], 'Убедитесь, что в архиве за месяц выводятся публикации этого месяца.'
+    assert not any(
+        'trunc' in query['sql'].lower() or 'COUNT(*)' in query['sql']
+        for query in queries.captured_queries
+    ), 'Убедитесь, что счётчики месяцев не вычисляются при запросе.'
+    assert [
+        (counter.month, counter.post_count)
+        for counter in response.context['months']
+    ] == [
+        (date(2024, 3, 1), 1), (date(2024, 1, 1), 2), (date(2023, 12, 1), 1)
+    ]
+    response = client.get('/archive/2024/')
+    assert len(response.context['page_obj']) == 3
+    assert client.get('/archive/2024/13/').status_code == (
+        HTTPStatus.NOT_FOUND)
+
+
+@pytest.mark.django_db
+def test_scheduled_posts_not_counted(client, archive_posts, mixer):
+    now = timezone.now()
+    mixer.blend(Post, author=archive_posts[0].author,
+                category=archive_posts[0].category, is_published=True,
+                pub_date=now + timedelta(days=40))
+    response = client.get(f'/archive/{now.year}/')
+    months = {
+        counter.month: counter.post_count
+        for counter in response.context['months']
+    }
+    assert months == {
+        date(2023, 12, 1): 1, date(2024, 1, 1): 2, date(2024, 3, 1): 1
+    }, 'Убедитесь, что отложенные публикации не входят в счётчики архива.'
+
+
+@pytest.mark.django_db
+def test_category_edit_does_not_refresh_posts(archive_posts):
+    category = archive_posts[0].category
+    with CaptureQueriesContext(connection) as queries:
+        category.description = 'Новое описание'
+        category.save()
+    assert not any(
+        '"blog_post"' in query['sql'] or '"blog_posttag"' in query['sql']
+        for query in queries.captured_queries
+    ), (
+        'Убедитесь, что изменение категории без смены видимости не'
+        ' обновляет её публикации.'
+    )
+    assert not VisibilityJob.objects.exists()
+    category.is_published = False
+    category.save()
+    assert get_counts(), (
+        'Убедитесь, что публикации категории обновляются фоновой задачей,'
+        ' а не при сохранении.'
+    )
+    assert run_visibility_jobs(chunk_size=2) == 1
+    assert get_counts() == {}
+
+
+@pytest.mark.django_db
+def test_text_edit_keeps_month_counts(archive_posts):
+    post = archive_posts[1]
+    with CaptureQueriesContext(connection) as queries:
+        post.text = 'Новый текст'
+        post.save()
+    assert not any(
+        'blog_monthlypostcount' in query['sql']
+        for query in queries.captured_queries
+    ), (
+        'Убедитесь, что изменение публикации без смены видимости и месяца'
+        ' не пересчитывает архив.'
+    )
+    post.is_published = False
+    post.save()
+    assert get_counts()[date(2024, 1, 1)] == 1
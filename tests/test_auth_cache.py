@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+def test_authenticated_page_view_uses_cached_user(
+        user_client, django_assert_num_queries):
+    user_client.get('/pages/about/')
+    with django_assert_num_queries(0):
+        user_client.get('/pages/about/')
+
+
+@pytest.mark.django_db
+def test_user_cache_invalidated_on_save(user, user_client):
+    user_client.get('/pages/about/')
+    user.username = 'renamed'
+    user.save()
+    content = user_client.get('/pages/about/').content.decode('utf-8')
+    assert 'renamed' in content, (
+        'Убедитесь, что кэш пользователя сбрасывается при его сохранении.'
+    )
+
+
+@pytest.mark.django_db
+def test_edit_profile_does_not_refetch_user(
+        user_client, django_assert_num_queries):
+    user_client.get('/pages/about/')
+    with django_assert_num_queries(0):
+        user_client.get('/profile/edit/')
+
+
+@pytest.mark.django_db
+def test_invalid_profile_form_keeps_request_user(user, user_client, mixer):
+    mixer.blend('auth.User', username='taken')
+    response = user_client.post('/profile/edit/', {
+        'username': 'taken',
+        'first_name': 'Имя',
+        'last_name': 'Фамилия',
+        'email': 'user@example.com',
+    })
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['user'].username == user.username, (
+        'Убедитесь, что невалидная форма профиля не меняет'
+        ' текущего пользователя запроса.'
+    )
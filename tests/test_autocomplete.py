@@ -0,0 +1,51 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.models import Location
+
+
+@pytest.mark.django_db
+def test_location_autocomplete(user_client, mixer):
+    for name in ('Москва', 'Мурманск', 'Омск', 'москворецкий парк'):
+        mixer.blend(Location, name=name)
+    response = user_client.get('/autocomplete/location/', {'q': 'моск'})
+    assert response.status_code == HTTPStatus.OK
+    names = [item['text'] for item in response.json()['results']]
+    assert names == ['Москва', 'москворецкий парк'], (
+        'Убедитесь, что подсказки ищут местоположения по началу названия.'
+    )
+
+
+@pytest.mark.django_db
+def test_autocomplete_requires_login(client):
+    response = client.get('/autocomplete/category/', {'q': 'a'})
+    assert response.status_code == HTTPStatus.FOUND
+
+
+@pytest.mark.django_db
+def test_post_form_does_not_list_all_locations(
+        user_client, mixer, published_category):
+    mixer.cycle(30).blend(Location)
+    content = user_client.get('/posts/create/').content.decode('utf-8')
+    assert content.count('<option') <= 2, (
+        'Убедитесь, что форма публикации не выводит все категории и'
+        ' местоположения в виде <select>.'
+    )
+    assert 'data-autocomplete-url="/autocomplete/location/"' in content
+
+
+@pytest.mark.django_db
+def test_post_form_rejects_non_numeric_choice(user_client, published_category):
+    response = user_client.post('/posts/create/', {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': '2024-01-01 10:00',
+        'category': 'abc',
+        'location': 'x1',
+    })
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что нечисловое значение категории или местоположения'
+        ' выводит ошибку формы, а не ошибку сервера.'
+    )
+    assert response.context['form'].errors.get('category')
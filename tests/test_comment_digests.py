@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.test import override_settings
+
+from blog.models import Comment, Post
+from notifications import digests
+from notifications.models import CommentEvent
+
+
+@pytest.fixture
+def commented_posts(mixer, user, another_user):
+    posts = mixer.cycle(2).blend(Post, author=user)
+    for post in posts:
+        mixer.cycle(3).blend(Comment, post=post, author=another_user)
+        mixer.blend(Comment, post=post, author=user)
+    return posts
+
+
+@pytest.mark.django_db
+def test_comment_events_recorded(commented_posts, user):
+    assert list(CommentEvent.objects.filter(recipient=user).values_list(
+        'post', 'count').order_by('post')) == [
+        (post.pk, 3) for post in commented_posts
+    ], (
+        'Убедитесь, что чужие комментарии к публикации учитываются'
+        ' счётчиком в одной строке на публикацию.'
+    )
+
+
+@pytest.mark.django_db
+def test_single_digest_per_author(commented_posts, user):
+    user.email = 'author@example.com'
+    user.save()
+    with override_settings(COMMENT_DIGEST_WINDOW=timedelta(0)):
+        call_command('send_comment_digests')
+    assert len(mail.outbox) == 1, (
+        'Убедитесь, что автору отправляется одно письмо со сводкой.'
+    )
+    body = mail.outbox[0].body
+    for post in commented_posts:
+        assert f'«{post.title}» — 3' in body
+    assert not CommentEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_digest_waits_for_window(commented_posts, user):
+    user.email = 'author@example.com'
+    user.save()
+    with override_settings(COMMENT_DIGEST_WINDOW=timedelta(hours=1)):
+        call_command('send_comment_digests')
+    assert not mail.outbox
+    assert CommentEvent.objects.exists()
+
+
+@pytest.mark.django_db
+def test_comments_after_read_wait_for_next_digest(
+        commented_posts, user, another_user, monkeypatch):
+    user.email = 'author@example.com'
+    user.save()
+    build_digests = digests.build_digests
+
+    def comment_while_sending(events):
+        Comment.objects.create(
+            post=commented_posts[0], author=another_user, text='Новый')
+        return build_digests(events)
+
+    monkeypatch.setattr(digests, 'build_digests', comment_while_sending)
+    with override_settings(COMMENT_DIGEST_WINDOW=timedelta(0)):
+        call_command('send_comment_digests')
+    assert list(CommentEvent.objects.values_list('post', 'count')) == [
+        (commented_posts[0].pk, 1)
+    ], (
+        'Убедитесь, что комментарии, пришедшие во время отправки сводки,'
+        ' остаются для следующей сводки.'
+    )
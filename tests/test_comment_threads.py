@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+
+@pytest.fixture
+def post(mixer, user):
+    return mixer.blend(Post, author=user)
+
+
+def reply(user_client, post, parent=None, text='Ответ'):
+    data = {'text': text}
+    if parent is not None:
+        data['parent'] = parent.id
+    user_client.post(f'/posts/{post.id}/comment/', data)
+    return Comment.objects.latest('id')
+
+
+@pytest.mark.django_db
+def test_replies_follow_their_thread(user_client, post):
+    first = reply(user_client, post, text='Первая ветка')
+    second = reply(user_client, post, text='Вторая ветка')
+    answer = reply(user_client, post, first, text='Ответ на первую')
+    assert answer.parent == first and answer.depth == 1
+    assert answer.path.startswith(first.path)
+
+    response = user_client.get(f'/posts/{post.id}/')
+    assert list(response.context['comments']) == [first, answer, second], (
+        'Убедитесь, что ответы выводятся сразу после комментария, на который'
+        ' они даны.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(COMMENT_MAX_DEPTH=1)
+def test_reply_depth_is_limited(user_client, post):
+    root = reply(user_client, post)
+    child = reply(user_client, post, root)
+    grandchild = reply(user_client, post, child)
+    assert grandchild.parent == root and grandchild.depth == 1, (
+        'Убедитесь, что ответ глубже COMMENT_MAX_DEPTH прикрепляется к'
+        ' ближайшему допустимому предку.'
+    )
+
+
+@pytest.mark.django_db
+def test_threads_paginated_by_root(user_client, post, mixer, another_user):
+    roots = mixer.cycle(12).blend(Comment, post=post, author=another_user)
+    for root in roots:
+        mixer.blend(Comment, post=post, author=another_user, parent=root)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(f'/posts/{post.id}/?page=2')
+    comments = list(response.context['comments'])
+    assert [comment for comment in comments if not comment.parent_id] == (
+        roots[10:]
+    ), 'Убедитесь, что комментарии разбиты на страницы по веткам.'
+    assert len(comments) == 4
+    comment_queries = [
+        query for query in queries.captured_queries
+        if 'blog_comment' in query['sql']
+    ]
+    assert len(comment_queries) <= 3, (
+        'Убедитесь, что ветки страницы выбираются одним запросом.'
+    )
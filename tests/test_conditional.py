@@ -0,0 +1,94 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.buffers import post_readers, post_views
+from blog.models import Comment, Post
+from blog.services import set_published
+
+
+@pytest.fixture
+def post(mixer, user):
+    post = mixer.blend(
+        Post, author=user, is_published=True, category__is_published=True,
+        pub_date=timezone.now() - timedelta(days=1))
+    post_views.pending.clear()
+    post_readers.pending.clear()
+    yield post
+    post_views.pending.clear()
+    post_readers.pending.clear()
+
+
+@pytest.mark.django_db
+def test_updated_at_tracks_changes(post):
+    updated_at = post.updated_at
+    post.title = 'Новый заголовок'
+    post.save()
+    assert post.updated_at > updated_at, (
+        'Убедитесь, что поле updated_at обновляется при сохранении.'
+    )
+    set_published(Post.objects.filter(pk=post.pk), False)
+    assert Post.objects.get(pk=post.pk).updated_at > post.updated_at, (
+        'Убедитесь, что массовые изменения тоже обновляют updated_at.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_detail_not_modified(another_user_client, another_user, post):
+    url = f'/posts/{post.id}/'
+    response = another_user_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.has_header('Last-Modified')
+    etag = response['ETag']
+    with CaptureQueriesContext(connection) as queries:
+        response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что неизменившаяся публикация отдаётся ответом 304.'
+    )
+    assert not any(
+        'blog_comment"."text' in query['sql']
+        for query in queries.captured_queries
+    ), 'Убедитесь, что при ответе 304 комментарии не выбираются.'
+    assert post_views.pending[post.id] == 2, (
+        'Убедитесь, что ответ 304 тоже учитывается как просмотр.'
+    )
+
+    comment = Comment.objects.create(
+        post=post, author=another_user, text='Новый')
+    response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что новый комментарий меняет ETag страницы.'
+    )
+    etag = response['ETag']
+    comment.text = 'Исправленный'
+    comment.save()
+    assert another_user_client.get(
+        url, HTTP_IF_NONE_MATCH=etag).status_code == HTTPStatus.OK, (
+        'Убедитесь, что изменение комментария меняет ETag страницы.'
+    )
+    etag = another_user_client.get(url)['ETag']
+    comment.delete()
+    assert another_user_client.get(
+        url, HTTP_IF_NONE_MATCH=etag).status_code == HTTPStatus.OK, (
+        'Убедитесь, что удаление комментария меняет ETag страницы.'
+    )
+
+
+@pytest.mark.django_db
+def test_profile_not_modified(client, post):
+    url = f'/profile/{post.author.username}/'
+    response = client.get(url)
+    assert len(response.context['page_obj']) == 1
+    etag = response['ETag']
+    assert client.get(
+        url, HTTP_IF_NONE_MATCH=etag).status_code == HTTPStatus.NOT_MODIFIED
+    set_published(Post.objects.filter(pk=post.pk), False)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context['page_obj']) == 0, (
+        'Убедитесь, что снятие публикации меняет ETag страницы автора.'
+    )
@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import (
+    Category, Comment, DeletionJob, Location, Post, User
+)
+
+
+@pytest.fixture
+def post_with_comments(mixer, user):
+    post = mixer.blend(Post, author=user)
+    mixer.cycle(7).blend(Comment, post=post)
+    return post
+
+
+@pytest.mark.django_db
+def test_delete_post_hides_it_immediately(user_client, post_with_comments):
+    response = user_client.post(f'/posts/{post_with_comments.id}/delete/')
+    assert response.status_code == HTTPStatus.FOUND
+    assert not Post.objects.filter(pk=post_with_comments.pk).exists()
+    assert Post.all_objects.filter(pk=post_with_comments.pk).exists(), (
+        'Убедитесь, что публикация сначала только скрывается.'
+    )
+    job = DeletionJob.objects.get()
+    assert (job.total, job.processed) == (7, 0)
+    response = user_client.get(f'/posts/{post_with_comments.id}/')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_background_purge_in_batches(
+        user_client, post_with_comments):
+    user_client.post(f'/posts/{post_with_comments.id}/delete/')
+    call_command('run_deletion_jobs', chunk_size=3)
+    assert not Post.all_objects.filter(pk=post_with_comments.pk).exists()
+    assert not Comment.objects.exists(), (
+        'Убедитесь, что фоновая задача удаляет комментарии публикации.'
+    )
+    job = DeletionJob.objects.get()
+    assert job.processed == 7 and job.finished_at, (
+        'Убедитесь, что прогресс удаления сохраняется в задаче.'
+    )
+
+
+@pytest.mark.django_db
+def test_delete_user_in_batches(mixer, user, another_user):
+    own_post = mixer.blend(Post, author=user)
+    mixer.cycle(3).blend(Comment, post=own_post, author=another_user)
+    other_post = mixer.blend(Post, author=another_user)
+    mixer.cycle(2).blend(Comment, post=other_post, author=user)
+    mixer.blend(Comment, post=own_post, author=user)
+    call_command('delete_objects', 'user', ids=[user.pk])
+    user.refresh_from_db()
+    assert not user.is_active, (
+        'Убедитесь, что пользователь сразу блокируется.'
+    )
+    call_command('run_deletion_jobs', chunk_size=2)
+    assert not User.objects.filter(pk=user.pk).exists()
+    assert list(Post.objects.all()) == [other_post]
+    assert not Comment.objects.exists()
+    job = DeletionJob.objects.get()
+    assert job.processed == job.total == 7, (
+        'Убедитесь, что комментарии к своим публикациям учитываются'
+        ' в объёме задачи один раз.'
+    )
+
+
+@pytest.mark.django_db
+def test_delete_category_detaches_posts(mixer, user):
+    category = mixer.blend(Category, is_published=True)
+    posts = mixer.cycle(5).blend(Post, author=user, category=category)
+    call_command('delete_objects', 'category', ids=[category.pk], now=True,
+                 chunk_size=2)
+    assert not Category.objects.filter(pk=category.pk).exists()
+    assert Post.objects.filter(
+        pk__in=[post.pk for post in posts], category=None).count() == 5, (
+        'Убедитесь, что публикации удалённой категории сохраняются.'
+    )
+
+
+@pytest.mark.django_db
+def test_admin_delete_schedules_job(admin_client, mixer):
+    location = mixer.blend(Location)
+    url = f'/admin/blog/location/{location.pk}/delete/'
+    assert admin_client.get(url).status_code == HTTPStatus.OK
+    admin_client.post(url, {'post': 'yes'})
+    assert DeletionJob.objects.filter(
+        model='blog.location', object_id=location.pk).exists(), (
+        'Убедитесь, что удаление из админки выполняется фоновой задачей.'
+    )
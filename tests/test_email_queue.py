@@ -0,0 +1,130 @@
+import socketserver
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+
+from notifications.models import OutgoingEmail
+from notifications.outbox import send_queued_mail
+
+
+class SMTPStubHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 stub')
+        data = None
+        for raw_line in self.rfile:
+            line = raw_line.decode().rstrip('\r\n')
+            if data is not None:
+                if line == '.':
+                    self.server.messages.append('\n'.join(data))
+                    data = None
+                    self.reply('250 OK')
+                else:
+                    data.append(line)
+            elif line[:4].upper() == 'DATA':
+                data = []
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+            elif line[:4].upper() == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPStubHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.messages = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def queued_email():
+    with override_settings(
+            EMAIL_BACKEND='notifications.backends.QueuedEmailBackend'):
+        yield
+
+
+@pytest.mark.django_db
+def test_send_mail_is_queued(queued_email):
+    mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+    assert OutgoingEmail.objects.count() == 1, (
+        'Убедитесь, что письма складываются в очередь исходящих.'
+    )
+    assert not mail.outbox
+
+
+@pytest.mark.django_db
+def test_worker_sends_batch_over_one_connection(queued_email, smtp_server):
+    for number in range(3):
+        mail.send_mail(f'Тема {number}', 'Текст', 'from@example.com',
+                       [f'to{number}@example.com'])
+    with override_settings(
+            EMAIL_QUEUE_DELIVERY_BACKEND=(
+                'django.core.mail.backends.smtp.EmailBackend'),
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=smtp_server.server_address[1]):
+        call_command('send_queued_mail')
+    assert len(smtp_server.messages) == 3
+    assert smtp_server.connections == 1, (
+        'Убедитесь, что пачка писем отправляется через одно соединение.'
+    )
+    assert not OutgoingEmail.objects.exists()
+
+
+@pytest.mark.django_db
+def test_worker_retries_failed_delivery(queued_email, smtp_server):
+    mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+    port = smtp_server.server_address[1]
+    smtp_server.shutdown()
+    smtp_server.server_close()
+    with override_settings(
+            EMAIL_QUEUE_DELIVERY_BACKEND=(
+                'django.core.mail.backends.smtp.EmailBackend'),
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=port,
+            EMAIL_TIMEOUT=1):
+        call_command('send_queued_mail')
+    email = OutgoingEmail.objects.get()
+    assert email.attempts == 1 and email.last_error, (
+        'Убедитесь, что неотправленное письмо остаётся в очереди для'
+        ' повторной попытки.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(EMAIL_QUEUE_DELIVERY_BACKEND=(
+    'django.core.mail.backends.locmem.EmailBackend'))
+def test_worker_skips_emails_leased_by_another(queued_email, monkeypatch):
+    mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+    atomic = transaction.atomic
+
+    @contextmanager
+    def leased_by_another(*args, **kwargs):
+        OutgoingEmail.objects.update(
+            next_attempt_at=timezone.now() + timedelta(minutes=5))
+        with atomic(*args, **kwargs):
+            yield
+
+    monkeypatch.setattr(transaction, 'atomic', leased_by_another)
+    assert send_queued_mail() == (0, 0), (
+        'Убедитесь, что письма, захваченные другим обработчиком между'
+        ' выборкой и захватом, не отправляются повторно.'
+    )
+    assert not mail.outbox
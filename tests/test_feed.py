@@ -0,0 +1,83 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Follow, Post
+from blog.timeline import get_feed_page, parse_cursor
+
+
+@pytest.fixture
+def authors(mixer):
+    return mixer.cycle(4).blend('auth.User')
+
+
+@pytest.fixture
+def feed_posts(mixer, authors, user):
+    now = timezone.now()
+    category = mixer.blend('blog.Category', is_published=True)
+    posts = []
+    for number in range(24):
+        posts.append(mixer.blend(
+            Post, author=authors[number % 4], category=category,
+            is_published=True,
+            pub_date=now - timedelta(hours=number % 12)))
+    for author in authors[:3]:
+        Follow.objects.create(user=user, author=author)
+    return [
+        post for post in posts if post.author in authors[:3]
+    ]
+
+
+@pytest.mark.django_db
+def test_feed_merges_followed_authors(user, feed_posts):
+    expected = sorted(
+        feed_posts, key=lambda post: (post.pub_date, post.pk), reverse=True)
+    result, cursor = [], None
+    while True:
+        page, next_cursor = get_feed_page(user, cursor, size=5)
+        result.extend(page)
+        if next_cursor is None:
+            break
+        cursor = parse_cursor(next_cursor)
+    assert result == expected, (
+        'Убедитесь, что лента содержит публикации только тех авторов, на'
+        ' которых подписан пользователь, от новых к старым.'
+    )
+
+
+@pytest.mark.django_db
+def test_feed_queries_do_not_grow(user, feed_posts, mixer):
+    with CaptureQueriesContext(connection) as queries:
+        get_feed_page(user, size=5)
+    for author in mixer.cycle(50).blend('auth.User'):
+        Follow.objects.create(user=user, author=author)
+    with CaptureQueriesContext(connection) as more_queries:
+        get_feed_page(user, size=5)
+    assert len(queries) == len(more_queries) == 2, (
+        'Убедитесь, что число запросов ленты не зависит от числа подписок.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(TIMELINE_FANOUT=False)
+def test_follow_views(user_client, user, another_user, feed_posts):
+    url = f'/profile/{another_user.username}/'
+    user_client.post(url + 'follow/')
+    assert Follow.objects.filter(user=user, author=another_user).exists()
+    assert user_client.get(url).context['is_following']
+    user_client.post(url + 'unfollow/')
+    assert not Follow.objects.filter(user=user, author=another_user).exists()
+
+    response = user_client.get('/feed/')
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.context['posts']) == 10
+    response = user_client.get(
+        '/feed/', {'before': response.context['next_cursor']})
+    assert len(response.context['posts']) == 8, (
+        'Убедитесь, что лента листается по курсору.'
+    )
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+
+
+@pytest.fixture
+def feed_posts(mixer, user, another_user):
+    cache.clear()
+    category = mixer.blend('blog.Category', is_published=True)
+    now = timezone.now()
+    posts = [
+        mixer.blend(Post, author=author, category=category, is_published=True,
+                    title=f'Публикация {number}',
+                    pub_date=now - timedelta(hours=number + 1))
+        for number, author in enumerate((user, another_user, user))
+    ]
+    mixer.blend(Post, author=user, category=category, is_published=True,
+                title='Отложенная', pub_date=now + timedelta(days=1))
+    return posts
+
+
+def post_queries(queries):
+    return [
+        query for query in queries.captured_queries
+        if 'blog_post' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', ('/rss/', '/atom/'))
+def test_feed_conditional_responses(client, feed_posts, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    content = response.content.decode('utf-8')
+    assert 'Публикация 0' in content and 'Отложенная' not in content, (
+        'Убедитесь, что лента содержит только опубликованные публикации.'
+    )
+    assert response.has_header('ETag')
+    assert response.has_header('Last-Modified')
+    with CaptureQueriesContext(connection) as queries:
+        not_modified = client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+        cached = client.get(url)
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert cached.content == response.content
+    assert not post_queries(queries), (
+        'Убедитесь, что неизменившаяся лента отдаётся без запросов к'
+        ' публикациям.'
+    )
+    assert client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+    ).status_code == HTTPStatus.NOT_MODIFIED
+
+    feed_posts[0].title = 'Новый заголовок'
+    feed_posts[0].save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == HTTPStatus.OK
+    assert 'Новый заголовок' in response.content.decode('utf-8'), (
+        'Убедитесь, что изменение публикации сбрасывает кэш ленты.'
+    )
+
+
+@pytest.mark.django_db
+def test_category_and_author_feeds(client, feed_posts, another_user):
+    category = feed_posts[0].category
+    content = client.get(
+        f'/category/{category.slug}/rss/').content.decode('utf-8')
+    assert content.count('<item>') == 3
+    content = client.get(
+        f'/profile/{another_user.username}/atom/').content.decode('utf-8')
+    assert content.count('<entry>') == 1, (
+        'Убедитесь, что лента автора содержит только его публикации.'
+    )
+    category.is_published = False
+    category.save()
+    assert client.get(
+        f'/category/{category.slug}/rss/'
+    ).status_code == HTTPStatus.NOT_FOUND
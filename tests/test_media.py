@@ -0,0 +1,164 @@
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.test import override_settings
+from PIL import Image
+
+from blog import media
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_file(tmp_path):
+    (tmp_path / 'posts_images').mkdir()
+    (tmp_path / 'posts_images' / 'file.bin').write_bytes(CONTENT)
+    with override_settings(MEDIA_ROOT=tmp_path):
+        yield '/media/posts_images/file.bin'
+
+
+def test_media_full_response(client, media_file):
+    response = client.get(media_file)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что медиафайлы отдаются по адресу `/media/<path>`.'
+    )
+    assert b''.join(response.streaming_content) == CONTENT
+    assert response['ETag'].startswith('"'), (
+        'Убедитесь, что для медиафайлов формируется строгий ETag.'
+    )
+    assert response['Accept-Ranges'] == 'bytes'
+
+
+def test_media_conditional_request(client, media_file):
+    etag = client.get(media_file)['ETag']
+    response = client.get(media_file, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что при совпадении ETag возвращается статус 304.'
+    )
+
+
+def test_media_range_request(client, media_file):
+    response = client.get(media_file, HTTP_RANGE='bytes=10-19')
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert b''.join(response.streaming_content) == CONTENT[10:20]
+    assert response['Content-Range'] == f'bytes 10-19/{len(CONTENT)}'
+
+    response = client.get(media_file, HTTP_RANGE='bytes=-5')
+    assert b''.join(response.streaming_content) == CONTENT[-5:]
+
+    response = client.get(media_file, HTTP_RANGE=f'bytes={len(CONTENT)}-')
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+
+    response = client.get(
+        media_file, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"outdated"')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что при несовпадении If-Range файл отдаётся целиком.'
+    )
+
+
+def test_media_range_of_empty_file(client, media_file, tmp_path):
+    (tmp_path / 'posts_images' / 'empty.bin').write_bytes(b'')
+    response = client.get(
+        '/media/posts_images/empty.bin', HTTP_RANGE='bytes=-5')
+    assert response.status_code == (
+        HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE), (
+        'Убедитесь, что диапазон пустого файла отклоняется статусом 416.'
+    )
+    assert response['Content-Range'] == 'bytes */0'
+
+
+def test_media_offload(client, media_file):
+    with override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect'):
+        response = client.get(media_file)
+    assert response['X-Accel-Redirect'] == (
+        '/protected-media/posts_images/file.bin'
+    )
+    assert not response.content
+
+
+def test_media_outside_root(client, media_file):
+    response = client.get('/media/../settings.py')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.fixture
+def post_image(tmp_path):
+    (tmp_path / 'posts_images').mkdir()
+    Image.new('RGB', (800, 600)).save(
+        tmp_path / 'posts_images' / 'image.jpg', 'JPEG')
+    with override_settings(
+        MEDIA_ROOT=tmp_path,
+        MEDIA_RESIZE_CACHE_DIR=tmp_path / 'cache',
+        MEDIA_RESIZE_SIZES=[(320, 240)],
+    ):
+        yield 'posts_images/image.jpg'
+
+
+def test_media_resize(client, post_image, tmp_path):
+    response = client.get(f'/media/resize/320x240/{post_image}')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что изображение публикации отдаётся в разрешённом'
+        ' размере.'
+    )
+    content = b''.join(response.streaming_content)
+    assert Image.open(BytesIO(content)).size == (320, 240)
+    renditions = list((tmp_path / 'cache').rglob('*.jpg'))
+    assert len(renditions) == 1, (
+        'Убедитесь, что уменьшенная копия сохраняется в кэше на диске.'
+    )
+
+    response = client.get(f'/media/resize/640x480/{post_image}')
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что размеры вне списка разрешённых не отдаются.'
+    )
+
+
+def test_media_resize_cache_eviction(client, post_image, tmp_path):
+    with override_settings(
+        MEDIA_RESIZE_SIZES=[(320, 240), (160, 120)],
+        MEDIA_RESIZE_CACHE_MAX_SIZE=1,
+    ):
+        client.get(f'/media/resize/320x240/{post_image}')
+        response = client.get(f'/media/resize/160x120/{post_image}')
+    assert response.status_code == HTTPStatus.OK
+    renditions = list((tmp_path / 'cache').rglob('*.jpg'))
+    assert [path.parent.parent.name for path in renditions] == ['160x120'], (
+        'Убедитесь, что при превышении лимита кэша удаляются давно не'
+        ' запрошенные копии.'
+    )
+
+
+def test_media_resize_lock_released_on_error(post_image, tmp_path):
+    rendition_path = str(tmp_path / 'cache' / 'missing.jpg')
+    with pytest.raises(OSError):
+        media.get_rendition(
+            str(tmp_path / 'missing.jpg'), rendition_path, 320, 240)
+    assert rendition_path not in media.render_locks, (
+        'Убедитесь, что блокировка отрисовки освобождается и удаляется'
+        ' из словаря и при ошибке.'
+    )
+
+
+def test_media_resize_eviction_throttled(
+        client, post_image, tmp_path, monkeypatch):
+    walks = []
+    evict_renditions = media.evict_renditions
+
+    def counted(keep):
+        walks.append(keep)
+        return evict_renditions(keep)
+
+    monkeypatch.setattr(media, 'evict_renditions', counted)
+    monkeypatch.setitem(media.cache_usage, 'size', 0)
+    monkeypatch.setitem(media.cache_usage, 'checked_at', None)
+    with override_settings(
+        MEDIA_RESIZE_SIZES=[(320, 240), (160, 120)],
+        MEDIA_RESIZE_CACHE_CHECK_INTERVAL=3600,
+    ):
+        client.get(f'/media/resize/320x240/{post_image}')
+        client.get(f'/media/resize/160x120/{post_image}')
+    assert len(walks) == 1, (
+        'Убедитесь, что каталог кэша копий не обходится при каждой'
+        ' отрисовке, пока размер кэша не превышает лимит.'
+    )
@@ -0,0 +1,80 @@
+import random
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from blog import geo
+from blog.models import Location, Post
+
+
+def test_geohash_encode():
+    assert geo.encode(57.64911, 10.40744, 11) == 'u4pruydqqvj', (
+        'Убедитесь, что geohash вычисляется по стандартному алгоритму.'
+    )
+
+
+def test_covering_prefixes_contain_all_points_in_radius():
+    random.seed(1)
+    for _ in range(200):
+        latitude = random.uniform(-80, 80)
+        longitude = random.uniform(-180, 180)
+        radius = random.choice((0.5, 5, 50, 500))
+        prefixes = geo.covering_prefixes(latitude, longitude, radius)
+        points = [
+            (latitude + random.uniform(-1, 1) * radius / geo.KM_PER_DEGREE,
+             geo.wrap_longitude(
+                 longitude + random.uniform(-10, 10) * radius
+                 / geo.KM_PER_DEGREE))
+            for _ in range(50)
+        ]
+        distances = geo.distances_km(
+            latitude, longitude, *zip(*points))
+        for (lat, lon), distance in zip(points, distances):
+            if distance <= radius and -90 <= lat <= 90:
+                assert not prefixes or any(
+                    geo.encode(lat, lon).startswith(prefix)
+                    for prefix in prefixes
+                ), 'Убедитесь, что ячейки покрывают весь круг поиска.'
+
+
+@pytest.fixture
+def located_posts(mixer, user):
+    category = mixer.blend('blog.Category', is_published=True)
+    places = {
+        'Красная площадь': (55.7539, 37.6208),
+        'Парк Горького': (55.7298, 37.6010),
+        'Дворцовая площадь': (59.9391, 30.3159),
+    }
+    posts = {}
+    for number, (name, (latitude, longitude)) in enumerate(places.items()):
+        location = mixer.blend(
+            Location, name=name, is_published=True,
+            latitude=latitude, longitude=longitude)
+        posts[name] = mixer.blend(
+            Post, author=user, category=category, location=location,
+            is_published=True,
+            pub_date=timezone.now() - timedelta(hours=number + 1))
+    return posts
+
+
+@pytest.mark.django_db
+def test_nearby_view(client, located_posts):
+    location = located_posts['Красная площадь'].location
+    assert location.geohash == geo.encode(55.7539, 37.6208), (
+        'Убедитесь, что geohash места вычисляется при сохранении.'
+    )
+    response = client.get(
+        '/nearby/', {'latitude': 55.75, 'longitude': 37.62, 'radius': 5})
+    assert response.status_code == HTTPStatus.OK
+    posts = list(response.context['page_obj'])
+    assert posts == [
+        located_posts['Красная площадь'], located_posts['Парк Горького']
+    ], 'Убедитесь, что выводятся только публикации из мест в радиусе.'
+    assert posts[1].distance == pytest.approx(2.5, abs=0.3)
+
+    response = client.get(
+        '/nearby/', {'latitude': 56.86, 'longitude': 35.9, 'radius': 500})
+    assert len(response.context['page_obj']) == 3
+    assert client.get('/nearby/').status_code == HTTPStatus.OK
@@ -0,0 +1,104 @@
+import time
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import OperationalError, connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.buffers import post_views
+from blog.models import Post
+
+
+@pytest.fixture
+def published_posts(mixer, user):
+    posts = mixer.cycle(3).blend(
+        Post, author=user, is_published=True, category__is_published=True,
+        pub_date=datetime.now() - timedelta(days=1))
+    post_views.pending.clear()
+    yield posts
+    post_views.pending.clear()
+
+
+@pytest.mark.django_db
+@override_settings(POST_VIEWS_FLUSH_INTERVAL=3600)
+def test_views_are_buffered(another_user_client, published_posts):
+    post = published_posts[0]
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(3):
+            another_user_client.get(f'/posts/{post.id}/')
+    assert not [
+        query for query in queries.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ], 'Убедитесь, что просмотры не записываются в БД на каждый запрос.'
+    post.refresh_from_db()
+    assert post.views == 0
+
+
+@pytest.mark.django_db
+@override_settings(POST_VIEWS_FLUSH_INTERVAL=3600)
+def test_flush_batches_updates(another_user_client, published_posts):
+    for post, views in zip(published_posts, (2, 2, 1)):
+        for _ in range(views):
+            another_user_client.get(f'/posts/{post.id}/')
+    with CaptureQueriesContext(connection) as queries:
+        assert post_views.flush() == 3
+    updates = [
+        query for query in queries.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 2, (
+        'Убедитесь, что приращения записываются одним UPDATE на каждое'
+        ' различное значение.'
+    )
+    assert [
+        post.views for post in Post.objects.order_by('id')
+    ] == [2, 2, 1]
+
+
+@pytest.mark.django_db
+@override_settings(POST_VIEWS_FLUSH_INTERVAL=0)
+def test_views_shown_on_card(another_user_client, published_posts):
+    post = published_posts[0]
+    another_user_client.get(f'/posts/{post.id}/')
+    content = another_user_client.get('/').content.decode('utf-8')
+    assert 'Просмотров: 1' in content, (
+        'Убедитесь, что число просмотров выводится в карточке публикации.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(POST_VIEWS_FLUSH_INTERVAL=0)
+def test_failed_flush_keeps_views(
+        another_user_client, published_posts, monkeypatch):
+    def locked(pending):
+        raise OperationalError('database is locked')
+
+    post = published_posts[0]
+    monkeypatch.setattr(post_views, 'write', locked)
+    response = another_user_client.get(f'/posts/{post.id}/')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что ошибка записи просмотров не приводит к ошибке'
+        ' страницы публикации.'
+    )
+    assert post_views.pending[post.id] == 1, (
+        'Убедитесь, что при ошибке записи просмотры остаются в буфере.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(POST_VIEWS_FLUSH_INTERVAL=1)
+def test_views_flushed_without_new_requests(
+        another_user_client, published_posts):
+    post = published_posts[0]
+    post_views.last_flush = time.monotonic()
+    another_user_client.get(f'/posts/{post.id}/')
+    deadline = time.monotonic() + 5
+    while post_views.pending and time.monotonic() < deadline:
+        time.sleep(0.1)
+    post.refresh_from_db()
+    assert post.views == 1, (
+        'Убедитесь, что накопленные просмотры записываются по интервалу'
+        ' и без новых запросов.'
+    )
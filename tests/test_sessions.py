@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+import pytest
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.utils import timezone
+
+
+def test_session_engine_avoids_db_per_request():
+    assert settings.SESSION_ENGINE != 'django.contrib.sessions.backends.db', (
+        'Убедитесь, что сессии не читаются из базы данных на каждый запрос.'
+    )
+
+
+@pytest.mark.django_db
+def test_clear_expired_sessions_in_batches():
+    now = timezone.now()
+    for number in range(5):
+        Session.objects.create(
+            session_key=f'expired{number}', session_data='',
+            expire_date=now - timedelta(days=1))
+    Session.objects.create(
+        session_key='alive', session_data='',
+        expire_date=now + timedelta(days=1))
+
+    call_command('clear_expired_sessions', batch_size=2)
+
+    assert list(Session.objects.values_list('session_key', flat=True)) == [
+        'alive'
+    ], 'Убедитесь, что команда удаляет только истёкшие сессии.'
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Post, SitemapShard
+from blog.services import set_published
+from blog.sitemaps import update_sitemaps
+
+
+@pytest.fixture
+def sitemap_settings(tmp_path):
+    with override_settings(SITEMAP_SHARD_SIZE=5, SITEMAP_CACHE_DIR=tmp_path):
+        yield
+
+
+@pytest.fixture
+def sitemap_posts(sitemap_settings, mixer, user):
+    category = mixer.blend('blog.Category', is_published=True)
+    return mixer.cycle(12).blend(
+        Post, author=user, category=category, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1))
+
+
+def get_generated():
+    return dict(SitemapShard.objects.filter(
+        section='posts').values_list('number', 'generated_at'))
+
+
+@pytest.mark.django_db
+def test_sitemap_index_and_shards(client, sitemap_posts):
+    content = client.get('/sitemap.xml').content.decode('utf-8')
+    shards = sitemap_posts[-1].pk // 5 + 1
+    for number in range(shards):
+        assert f'http://testserver/sitemap-posts-{number}.xml' in content, (
+            'Убедитесь, что индекс карты сайта перечисляет файлы по'
+            ' диапазонам id публикаций.'
+        )
+    assert '/sitemap-categories-0.xml' in content
+    assert '/sitemap-profiles-0.xml' in content
+
+    found = []
+    for number in range(shards):
+        response = client.get(f'/sitemap-posts-{number}.xml')
+        assert response.status_code == HTTPStatus.OK
+        found.append(b''.join(response.streaming_content).decode('utf-8'))
+    found = ''.join(found)
+    for post in sitemap_posts:
+        assert f'<loc>http://testserver/posts/{post.pk}/</loc>' in found
+    assert client.get(
+        f'/sitemap-posts-{shards}.xml').status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_only_changed_shards_regenerated(sitemap_posts):
+    update_sitemaps()
+    generated = get_generated()
+    assert update_sitemaps() == 0, (
+        'Убедитесь, что неизменённые файлы карты сайта не формируются'
+        ' заново.'
+    )
+    post = sitemap_posts[0]
+    set_published(Post.objects.filter(pk=post.pk), False)
+    assert update_sitemaps() == 1
+    changed = get_generated()
+    shard = post.pk // 5
+    assert changed[shard] > generated[shard]
+    assert all(
+        changed[number] == generated[number]
+        for number in generated if number != shard
+    ), 'Убедитесь, что формируются заново только изменённые файлы.'
+
+    post.is_published = True
+    post.save()
+    assert update_sitemaps() == 1
+
+
+@pytest.mark.django_db
+def test_scheduled_post_expires_shard(sitemap_posts, mixer, user):
+    scheduled = mixer.blend(
+        Post, author=user, category=sitemap_posts[0].category,
+        is_published=True, pub_date=timezone.now() + timedelta(hours=1))
+    update_sitemaps()
+    shard = SitemapShard.objects.get(
+        section='posts', number=scheduled.pk // 5)
+    assert shard.expires_at == scheduled.pub_date, (
+        'Убедитесь, что файл с отложенной публикацией устаревает к дате'
+        ' её публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_profiles_without_url_skipped(client, sitemap_settings, mixer):
+    users = [
+        mixer.blend('auth.User', username=username)
+        for username in ('john.doe', 'jane')
+    ]
+    numbers = {user.pk // 5 for user in users}
+    found = ''.join(
+        b''.join(client.get(
+            f'/sitemap-profiles-{number}.xml').streaming_content
+        ).decode('utf-8')
+        for number in numbers
+    )
+    assert '<loc>http://testserver/profile/jane/</loc>' in found, (
+        'Убедитесь, что имя пользователя, для которого нет адреса профиля,'
+        ' не ломает формирование карты сайта.'
+    )
+    assert 'john.doe' not in found
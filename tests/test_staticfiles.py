@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import override_settings
+
+from pages.management.commands.purge_css import purge, split_rules
+
+
+@pytest.fixture(scope='module')
+def collected_static(tmp_path_factory):
+    static_root = tmp_path_factory.mktemp('static')
+    with override_settings(STATIC_ROOT=static_root):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        yield static_root
+
+
+def test_collectstatic_hashed_and_compressed(collected_static):
+    url = static('css/bootstrap.min.css')
+    assert url != '/static/css/bootstrap.min.css', (
+        'Убедитесь, что имена статических файлов содержат хэш содержимого.'
+    )
+    hashed_name = staticfiles_storage.stored_name('css/bootstrap.min.css')
+    for suffix in ('.gz', '.br'):
+        assert (collected_static / (hashed_name + suffix)).is_file(), (
+            f'Убедитесь, что при сборке статики создаются файлы `{suffix}`.'
+        )
+
+
+def test_static_served_precompressed(client, collected_static):
+    url = static('css/bootstrap.min.css')
+    response = client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Encoding'] == 'br'
+    assert 'immutable' in response['Cache-Control'], (
+        'Убедитесь, что файлы с хэшем в имени отдаются с долгим'
+        ' кэшированием.'
+    )
+    assert 'Accept-Encoding' in response['Vary']
+
+    response = client.get(url)
+    assert not response.has_header('Content-Encoding')
+
+
+@pytest.mark.django_db
+def test_base_uses_local_bootstrap(client, collected_static):
+    content = client.get('/').content.decode('utf-8')
+    assert static('css/bootstrap.purged.css') in content, (
+        'Убедитесь, что в `base.html` подключается локальный bootstrap.'
+    )
+    assert '<style>:root{' in content, (
+        'Убедитесь, что критический CSS встроен в `base.html`.'
+    )
+
+
+def test_purge_css_keeps_used_selectors():
+    css = (
+        '@charset "UTF-8";:root{--x:1}.btn,.unused{color:red}'
+        '.unused>.btn{color:blue}@media (min-width:576px){.unused{top:0}'
+        '.card:not(.a,.b){top:1}}a[href="{x}"]{color:green}'
+    )
+    purged = ''.join(purge(split_rules(css), {'btn', 'card', 'a', 'b'}))
+    assert purged == (
+        '@charset "UTF-8";:root{--x:1}.btn{color:red}'
+        '@media (min-width:576px){.card:not(.a,.b){top:1}}'
+        'a[href="{x}"]{color:green}'
+    )
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post, PostTag, Tag
+from blog.services import (
+    run_deletion_jobs, run_visibility_jobs, schedule_deletion, set_published
+)
+from blog.tags import set_post_tags
+
+
+@pytest.fixture
+def tagged_posts(mixer, user):
+    now = timezone.now()
+    category = mixer.blend('blog.Category', is_published=True)
+    posts = mixer.cycle(3).blend(
+        Post, author=user, category=category, is_published=True,
+        pub_date=(now - timedelta(hours=hours) for hours in range(1, 4)))
+    for post in posts:
+        set_post_tags(post, ['django', 'python'])
+    return posts
+
+
+@pytest.fixture
+def create_post_data(mixer):
+    return {
+        'title': 'Публикация с тегами',
+        'text': 'Текст',
+        'pub_date': (timezone.now() - timedelta(minutes=1)).strftime(
+            '%Y-%m-%d %H:%M'),
+        'category': mixer.blend('blog.Category', is_published=True).id,
+        'location': mixer.blend('blog.Location', is_published=True).id,
+        'is_published': True,
+    }
+
+
+def get_counts():
+    return dict(Tag.objects.values_list('slug', 'post_count'))
+
+
+@pytest.mark.django_db
+def test_tag_counts_follow_visibility(tagged_posts):
+    assert get_counts() == {'django': 3, 'python': 3}
+    set_post_tags(tagged_posts[0], ['python', 'веб'])
+    assert get_counts() == {'django': 2, 'python': 3, 'веб': 1}, (
+        'Убедитесь, что счётчики тегов обновляются при изменении тегов.'
+    )
+    tagged_posts[1].is_published = False
+    tagged_posts[1].save()
+    assert get_counts()['python'] == 2
+    set_published(Post.objects.filter(pk=tagged_posts[1].pk), True)
+    assert get_counts()['python'] == 3
+    set_published(
+        type(tagged_posts[0].category).objects.all(), False)
+    run_visibility_jobs()
+    assert get_counts() == {'django': 0, 'python': 0, 'веб': 0}, (
+        'Убедитесь, что снятие категории с публикации скрывает её'
+        ' публикации из лент тегов.'
+    )
+
+
+@pytest.mark.django_db
+def test_deleted_posts_leave_tag_feed(tagged_posts):
+    schedule_deletion(tagged_posts[0])
+    assert get_counts() == {'django': 2, 'python': 2}
+    run_deletion_jobs()
+    assert not PostTag.objects.filter(post=tagged_posts[0]).exists()
+
+
+@pytest.mark.django_db
+def test_tag_page(client, tagged_posts, mixer):
+    future = mixer.blend(
+        Post, author=tagged_posts[0].author,
+        category=tagged_posts[0].category, is_published=True,
+        pub_date=timezone.now() + timedelta(days=1))
+    set_post_tags(future, ['django'])
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/tag/django/')
+    assert response.status_code == HTTPStatus.OK
+    assert list(response.context['page_obj']) == tagged_posts, (
+        'Убедитесь, что на странице тега выводятся опубликованные'
+        ' публикации с тегом, от новых к старым.'
+    )
+    assert response.context['page_obj'].paginator.count == 3, (
+        'Убедитесь, что отложенные публикации не входят в число публикаций'
+        ' с тегом на странице тега.'
+    )
+    assert not any(
+        query['sql'].startswith('SELECT COUNT(*)')
+        and 'FROM "blog_post"' in query['sql']
+        for query in queries.captured_queries
+    ), 'Убедитесь, что число публикаций с тегом берётся из счётчика тега.'
+    assert client.get('/tag/unknown/').status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_post_form_tags(user_client, user, create_post_data):
+    create_post_data['tag_names'] = 'Django, python , django'
+    user_client.post('/posts/create/', create_post_data)
+    post = Post.objects.get(author=user)
+    assert sorted(post.tags.values_list('name', flat=True)) == [
+        'django', 'python'
+    ], 'Убедитесь, что теги задаются в форме публикации через запятую.'
+    response = user_client.get(f'/posts/{post.id}/edit/')
+    assert response.context['form'].initial['tag_names'] == 'django, python'
+    assert '/tag/django/' in user_client.get(
+        f'/posts/{post.id}/').content.decode('utf-8')
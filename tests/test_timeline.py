@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import (
+    FanoutJob, Follow, FollowerCount, Post, TimelineEntry,
+)
+from blog.timeline import follow, get_timeline_page, unfollow
+
+
+@pytest.fixture(autouse=True)
+def clear_celebrities():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def category(mixer):
+    return mixer.blend('blog.Category', is_published=True)
+
+
+@pytest.fixture
+def location(mixer):
+    return mixer.blend('blog.Location', is_published=True)
+
+
+@pytest.fixture
+def create_post(category, location):
+    def create(client, title):
+        client.post('/posts/create/', {
+            'title': title,
+            'text': 'Текст',
+            'pub_date': (timezone.now() - timedelta(minutes=1)).strftime(
+                '%Y-%m-%d %H:%M'),
+            'category': category.id,
+            'location': location.id,
+            'is_published': True,
+        })
+        return Post.objects.get(title=title)
+
+    return create
+
+
+@pytest.mark.django_db
+def test_fanout_on_publish(
+        another_user, another_user_client, create_post, mixer):
+    readers = mixer.cycle(5).blend('auth.User')
+    for reader in readers:
+        Follow.objects.create(user=reader, author=another_user)
+    post = create_post(another_user_client, 'Новая публикация')
+    assert FanoutJob.objects.filter(post=post).exists(), (
+        'Убедитесь, что публикация ставится в очередь рассылки по лентам.'
+    )
+    call_command('run_fanout_jobs', chunk_size=2)
+    assert set(TimelineEntry.objects.filter(post=post).values_list(
+        'user_id', flat=True)) == {reader.id for reader in readers}, (
+        'Убедитесь, что публикация попадает в ленты всех подписчиков.'
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        posts, _ = get_timeline_page(readers[0])
+    assert posts == [post]
+    assert len(queries) == 1, (
+        'Убедитесь, что материализованная лента читается одним запросом.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(TIMELINE_MAX_ENTRIES=3)
+def test_timeline_capped(
+        user, another_user, another_user_client, create_post):
+    follow(user, another_user)
+    posts = [
+        create_post(another_user_client, f'Публикация {number}')
+        for number in range(5)
+    ]
+    call_command('run_fanout_jobs')
+    assert TimelineEntry.objects.filter(user=user).count() == 3, (
+        'Убедитесь, что лента читателя ограничена TIMELINE_MAX_ENTRIES.'
+    )
+    page, _ = get_timeline_page(user, size=10)
+    assert set(page) == set(posts[2:])
+
+
+@pytest.mark.django_db
+@override_settings(TIMELINE_CELEBRITY_FOLLOWERS=3)
+def test_celebrity_posts_read_on_demand(
+        user, another_user, another_user_client, create_post, mixer):
+    for reader in [user, *mixer.cycle(2).blend('auth.User')]:
+        follow(reader, another_user)
+    cache.clear()
+    post = create_post(another_user_client, 'Знаменитость')
+    assert not FanoutJob.objects.exists(), (
+        'Убедитесь, что публикации авторов с большим числом подписчиков не'
+        ' рассылаются по лентам.'
+    )
+    page, _ = get_timeline_page(user)
+    assert page == [post], (
+        'Убедитесь, что публикации знаменитостей добавляются в ленту при'
+        ' чтении.'
+    )
+
+
+@pytest.mark.django_db
+def test_follower_count_follows_subscriptions(user, another_user, mixer):
+    readers = [user, *mixer.cycle(2).blend('auth.User')]
+    for reader in readers:
+        follow(reader, another_user)
+    follow(user, another_user)
+    unfollow(readers[1], another_user)
+    assert FollowerCount.objects.get(
+        author=another_user).followers == 2, (
+        'Убедитесь, что число подписчиков автора обновляется при подписке'
+        ' и отписке, а повторная подписка его не меняет.'
+    )
+
+
+@pytest.mark.django_db
+def test_follow_backfills_and_unfollow_clears(
+        user, another_user, category, mixer):
+    posts = mixer.cycle(3).blend(
+        Post, author=another_user, category=category, is_published=True,
+        pub_date=timezone.now() - timedelta(days=1))
+    follow(user, another_user)
+    assert set(get_timeline_page(user)[0]) == set(posts)
+    unfollow(user, another_user)
+    assert not TimelineEntry.objects.filter(user=user).exists()
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.buffers import post_views
+from blog.models import Post, PostActivity, TrendingPost
+from blog.trending import get_window
+
+
+@pytest.fixture
+def posts(mixer, user):
+    posts = mixer.cycle(3).blend(
+        Post, author=user, is_published=True, category__is_published=True,
+        pub_date=datetime.now() - timedelta(days=1))
+    post_views.pending.clear()
+    yield posts
+    post_views.pending.clear()
+
+
+@pytest.mark.django_db
+def test_activity_counted_in_windows(posts, another_user_client):
+    for _ in range(3):
+        another_user_client.get(f'/posts/{posts[0].id}/')
+    another_user_client.post(
+        f'/posts/{posts[1].id}/comment/', {'text': 'Комментарий'})
+    post_views.flush()
+    activity = {
+        row.post_id: (row.views, row.comments)
+        for row in PostActivity.objects.filter(window=get_window())
+    }
+    assert activity == {posts[0].id: (3, 0), posts[1].id: (0, 1)}, (
+        'Убедитесь, что просмотры и комментарии учитываются в окне'
+        ' текущего времени.'
+    )
+
+
+@pytest.mark.django_db
+def test_trending_ranks_recent_activity(posts, client):
+    now = timezone.now()
+    PostActivity.objects.bulk_create([
+        PostActivity(post=posts[0], window=get_window(now), views=10),
+        PostActivity(post=posts[1], window=get_window(now), comments=3),
+        PostActivity(post=posts[2], window=get_window(now - timedelta(
+            days=1)), views=100),
+        PostActivity(post=posts[2], window=get_window(now - timedelta(
+            days=30)), views=1000),
+    ])
+    call_command('update_trending')
+    assert list(
+        TrendingPost.objects.values_list('post_id', flat=True)
+    ) == [posts[1].id, posts[0].id, posts[2].id], (
+        'Убедитесь, что недавняя активность весит больше давней.'
+    )
+    assert PostActivity.objects.count() == 3, (
+        'Убедитесь, что окна за горизонтом удаляются.'
+    )
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/trending/')
+    assert [post.id for post in response.context['posts']] == [
+        posts[1].id, posts[0].id, posts[2].id
+    ]
+    assert len([
+        query for query in queries.captured_queries
+        if 'blog_post' in query['sql']
+    ]) == 1, 'Убедитесь, что популярное выбирается одним запросом.'
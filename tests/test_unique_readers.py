@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.test import Client
+
+from blog import hll
+from blog.buffers import post_readers, unique_readers
+from blog.models import Post, ReaderSketch
+
+
+def test_hll_estimate_accuracy():
+    registers = bytearray(hll.REGISTERS)
+    for number in range(20000):
+        hll.add(registers, f'user:{number}')
+        hll.add(registers, f'user:{number}')
+    assert abs(hll.estimate(registers) - 20000) < 20000 * 0.1, (
+        'Убедитесь, что оценка HyperLogLog близка к числу уникальных'
+        ' значений.'
+    )
+    assert len(registers) == hll.REGISTERS
+
+
+def test_hll_merge_is_union():
+    first, second = bytearray(hll.REGISTERS), bytearray(hll.REGISTERS)
+    for number in range(1000):
+        hll.add(first, str(number))
+        hll.add(second, str(number + 500))
+    assert abs(hll.estimate(hll.merge(first, second)) - 1500) < 150
+
+
+@pytest.fixture
+def posts(mixer, user, another_user):
+    category = mixer.blend('blog.Category', is_published=True)
+    posts = mixer.cycle(2).blend(
+        Post, author=another_user, category=category, is_published=True,
+        pub_date=datetime.now() - timedelta(days=1))
+    post_readers.pending.clear()
+    yield posts
+    post_readers.pending.clear()
+
+
+@pytest.mark.django_db
+def test_unique_readers_per_post_author_and_category(posts, mixer):
+    readers = mixer.cycle(5).blend('auth.User')
+    for number, reader in enumerate(readers):
+        client = Client()
+        client.force_login(reader)
+        client.get(f'/posts/{posts[0].id}/')
+        client.get(f'/posts/{posts[0].id}/')
+        if number < 2:
+            client.get(f'/posts/{posts[1].id}/')
+    post_readers.flush()
+    assert unique_readers(ReaderSketch.POST, [posts[0].id]) == 5, (
+        'Убедитесь, что повторные просмотры одного читателя не учитываются.'
+    )
+    assert unique_readers(ReaderSketch.POST, [posts[1].id]) == 2
+    assert unique_readers(
+        ReaderSketch.POST, [post.id for post in posts]) == 5
+    assert unique_readers(ReaderSketch.AUTHOR, [posts[0].author_id]) == 5
+    assert unique_readers(
+        ReaderSketch.CATEGORY, [posts[0].category_id]) == 5
+    assert ReaderSketch.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_flush_merges_with_stored_registers(posts, user_client):
+    user_client.get(f'/posts/{posts[0].id}/')
+    post_readers.flush()
+    another = Client()
+    another.get(f'/posts/{posts[0].id}/', REMOTE_ADDR='10.0.0.1')
+    post_readers.flush()
+    assert unique_readers(ReaderSketch.POST, [posts[0].id]) == 2
+    content = user_client.get(
+        f'/profile/{posts[0].author.username}/').content.decode('utf-8')
+    assert 'Читателей: ~2' in content, (
+        'Убедитесь, что на странице пользователя выводится число уникальных'
+        ' читателей.'
+    )